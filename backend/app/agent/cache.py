@@ -1,20 +1,106 @@
-import os
+import hashlib
+import logging
+import threading
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.outputs import Generation
 from langchain_redis.cache import RedisSemanticCache
-from langchain_core.globals import set_llm_cache
 
-from ..embedding.embedder import hf
+from ..embedding.embedder import get_embeddings, embed_query
 from ..core.config import settings
+from ..core.metrics import cache_stats
 
 
-def init_semantic_cache(distance_threshold: float = 0.2, ttl: int = 3600):
-    """Initialize Redis based semantic cache for LLM calls"""
+logger = logging.getLogger(__name__)
 
-    semantic_cache = RedisSemanticCache(
-        embeddings=hf,
-        redis_url=settings.REDIS_CACHE_URL,
-        distance_threshold=distance_threshold,
-        ttl=ttl
-    )
 
-    # Register semantic cache globally
-    set_llm_cache(semantic_cache)
\ No newline at end of file
+class _CachedQueryEmbeddings(Embeddings):
+    """Routes cache lookups through the query embedding cache; the question was usually just embedded by DocumentSearch"""
+
+    def embed_query(self, text: str) -> List[float]:
+        return embed_query(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return get_embeddings().embed_documents(texts)
+
+
+def context_fingerprint(context: str) -> str:
+    """Scope cache entries to the model and the exact retrieved context"""
+    return hashlib.sha256(f"{settings.LLM_MODEL}\x00{context}".encode()).hexdigest()
+
+
+class SemanticAnswerCache:
+    """Redis semantic cache of final answers keyed by question + retrieved-context fingerprint.
+
+    Unlike a global LLM cache, which keys on the whole prompt (history included),
+    a hit only needs a semantically close question over the same retrieved chunks.
+    """
+
+    def __init__(self, distance_threshold: float = 0.15, ttl: int = 7200):
+        self.distance_threshold = distance_threshold
+        self.ttl = ttl
+        self._cache: Optional[RedisSemanticCache] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved_ms = 0.0
+        self._avg_llm_ms: Optional[float] = None    # moving average of the LLM calls a hit replaces
+
+    def _get_cache(self) -> RedisSemanticCache:
+        """Connect on first use; a Redis outage surfaces as a cache miss and is retried next time"""
+
+        if self._cache is None:
+            with self._lock:
+                if self._cache is None:
+                    self._cache = RedisSemanticCache(
+                        embeddings=_CachedQueryEmbeddings(),
+                        redis_url=settings.REDIS_CACHE_URL,
+                        distance_threshold=self.distance_threshold,
+                        ttl=self.ttl
+                    )
+        return self._cache
+
+    async def alookup(self, question: str, context: str) -> Optional[str]:
+        try:
+            result = await self._get_cache().alookup(question, context_fingerprint(context))
+        except Exception as e:
+            logger.warning("Semantic cache unavailable: %s", e)
+            result = None
+
+        with self._lock:
+            if result:
+                self.hits += 1
+                self.latency_saved_ms += self._avg_llm_ms or 0.0
+                return result[0].text
+            self.misses += 1
+            return None
+
+    async def aupdate(self, question: str, context: str, answer: str, llm_ms: float):
+        with self._lock:
+            self._avg_llm_ms = llm_ms if self._avg_llm_ms is None else 0.9 * self._avg_llm_ms + 0.1 * llm_ms
+        try:
+            await self._get_cache().aupdate(question, context_fingerprint(context), [Generation(text=answer)])
+        except Exception as e:
+            logger.warning("Semantic cache unavailable: %s", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "latency_saved_ms": self.latency_saved_ms,
+            }
+
+
+answer_cache = (
+    SemanticAnswerCache(
+        distance_threshold=settings.SEMANTIC_CACHE_DISTANCE_THRESHOLD,
+        ttl=settings.SEMANTIC_CACHE_TTL
+    )
+    if settings.SEMANTIC_CACHE_ENABLED else None
+)
+if answer_cache is not None:
+    cache_stats.register("semantic_answer", answer_cache.stats)
@@ -0,0 +1,101 @@
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from ..core.config import settings
+from ..core.metrics import AGENT_ITERATIONS, LLM_SECONDS, LLM_TOKENS, NODE_SECONDS, TOOL_SECONDS
+from ..core.tracing import current_trace_id, emit
+
+
+class GraphMetricsHandler(BaseCallbackHandler):
+    """Per-request callback that times graph nodes, tools and LLM calls.
+
+    One instance is passed in the config of each graph run. Node, tool and LLM
+    runs become trace spans, parented by LangChain's run ids under the request's
+    trace, and feed the Prometheus histograms. `finish()` records how many times
+    the agent node ran, i.e. the agent <-> tools loop iterations.
+    """
+
+    run_inline = True       # cheap bookkeeping; no need for an executor hop
+
+    def __init__(self):
+        self.trace_id = current_trace_id()
+        self.agent_iterations = 0
+        self._runs: Dict[UUID, tuple] = {}      # run_id -> (kind, name, start)
+
+    def _start(self, run_id: UUID, kind: str, name: str):
+        self._runs[run_id] = (kind, name, time.perf_counter())
+
+    def _end(self, run_id: UUID, parent_run_id: Optional[UUID], status: str, **attrs) -> Optional[tuple]:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return None
+        kind, name, start = run
+        duration = time.perf_counter() - start
+        emit({"type": "span", "name": f"{kind}.{name}", "trace_id": self.trace_id, "span_id": str(run_id),
+              "parent_id": str(parent_run_id) if parent_run_id else None,
+              "duration_ms": round(duration * 1000, 3), "status": status, **attrs})
+        return kind, name, duration
+
+    # Graph nodes
+    def on_chain_start(self, serialized: Optional[Dict[str, Any]], inputs: Any, *, run_id: UUID,
+                       metadata: Optional[Dict[str, Any]] = None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if node is not None and kwargs.get("name") == node:     # the node itself, not a runnable inside it
+            self._start(run_id, "node", node)
+            if node == "agent":
+                self.agent_iterations += 1
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs):
+        run = self._end(run_id, parent_run_id, "ok")
+        if run:
+            NODE_SECONDS.labels(run[1]).observe(run[2])
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs):
+        run = self._end(run_id, parent_run_id, "error", error=repr(error))
+        if run:
+            NODE_SECONDS.labels(run[1]).observe(run[2])
+
+    # Tools
+    def on_tool_start(self, serialized: Optional[Dict[str, Any]], input_str: str, *, run_id: UUID, **kwargs):
+        self._start(run_id, "tool", kwargs.get("name") or (serialized or {}).get("name", "unknown"))
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs):
+        run = self._end(run_id, parent_run_id, "ok")
+        if run:
+            TOOL_SECONDS.labels(run[1], "ok").observe(run[2])
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs):
+        run = self._end(run_id, parent_run_id, "error", error=repr(error))
+        if run:
+            TOOL_SECONDS.labels(run[1], "error").observe(run[2])
+
+    # LLM
+    def on_chat_model_start(self, serialized: Optional[Dict[str, Any]], messages, *, run_id: UUID, **kwargs):
+        self._start(run_id, "llm", settings.LLM_MODEL)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs):
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+
+        run = self._end(run_id, parent_run_id, "ok", prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        if run:
+            LLM_SECONDS.labels(run[1]).observe(run[2])
+            LLM_TOKENS.labels(run[1], "prompt").inc(prompt_tokens)
+            LLM_TOKENS.labels(run[1], "completion").inc(completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs):
+        run = self._end(run_id, parent_run_id, "error", error=repr(error))
+        if run:
+            LLM_SECONDS.labels(run[1]).observe(run[2])
+
+    def finish(self):
+        if self.agent_iterations:
+            AGENT_ITERATIONS.observe(self.agent_iterations)
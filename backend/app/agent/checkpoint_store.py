@@ -0,0 +1,189 @@
+import base64
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+from langgraph.checkpoint.redis.jsonplus_redis import JsonPlusRedisSerializer
+from langgraph.checkpoint.redis.util import safely_decode, to_storage_safe_id
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from redisvl.query import FilterQuery
+from redisvl.query.filter import Tag
+
+from ..core.tracing import span
+
+try:
+    import zstandard
+except ImportError:     # compression is optional
+    zstandard = None
+
+
+logger = logging.getLogger(__name__)
+
+COMPRESSED_TYPE = "msgpack+zstd"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class CompressedRedisSerializer(JsonPlusRedisSerializer):
+    """Stores channel values and writes as zstd-compressed msgpack, base64 encoded in the JSON documents.
+
+    Values written as plain JSON before compression was enabled still load.
+    """
+
+    def __init__(self, level: int = 3):
+        super().__init__()
+        self.level = level
+        self._msgpack = JsonPlusSerializer()
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, str]:
+        type_, data = self._msgpack.dumps_typed(obj)
+        if type_ != "msgpack":
+            return super().dumps_typed(obj)     # None, bytes, or not msgpack-encodable
+        return COMPRESSED_TYPE, base64.b64encode(zstandard.compress(data, self.level)).decode()
+
+    def loads_typed(self, data: Tuple[str, Union[str, bytes]]) -> Any:
+        type_, data_ = data
+        if type_ != COMPRESSED_TYPE:
+            return super().loads_typed(data)
+        # The sync write loader base64-decodes blobs itself
+        if not (isinstance(data_, bytes) and data_.startswith(ZSTD_MAGIC)):
+            data_ = base64.b64decode(data_)
+        return self._msgpack.loads_typed(("msgpack", zstandard.decompress(data_)))
+
+
+class TracedRedisSaver(AsyncRedisSaver):
+    """AsyncRedisSaver with trace spans, compact storage and per-thread pruning.
+
+    The checkpoint document no longer repeats the channel values: they are loaded
+    from the channel blobs anyway, and for this graph they are the whole message
+    history, so every step stored it twice.
+    """
+
+    def __init__(self, *args, compress: bool = False, compression_level: int = 3, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._json_serde = self.serde
+        if compress and zstandard is None:
+            logger.warning("zstandard is not installed; checkpoints are stored uncompressed")
+        elif compress:
+            self.serde = CompressedRedisSerializer(compression_level)
+
+    def _dump_checkpoint(self, checkpoint) -> Dict[str, Any]:
+        # The checkpoint document is queried as JSON, so it never goes through the compressing serde
+        checkpoint = {k: v for k, v in checkpoint.items() if k != "channel_values"}
+        type_, data = self._json_serde.dumps_typed(checkpoint)
+        return {"type": type_, **json.loads(data), "pending_sends": []}
+
+    async def aget_tuple(self, config):
+        with span("checkpoint.get"):
+            return await super().aget_tuple(config)
+
+    async def aput(self, config, checkpoint, metadata, new_versions, *args, **kwargs):
+        with span("checkpoint.put"):
+            return await super().aput(config, checkpoint, metadata, new_versions, *args, **kwargs)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        with span("checkpoint.put_writes"):
+            return await super().aput_writes(config, writes, task_id, task_path)
+
+    async def _thread_docs(self, index, thread_id: str, fields: List[str]) -> list:
+        query = FilterQuery(filter_expression=Tag("thread_id") == thread_id, return_fields=fields, num_results=10000)
+        return (await index.search(query)).docs
+
+    async def aprune(self, thread_id: str, keep: int) -> int:
+        """Delete all but the newest `keep` checkpoints of a thread, with the blobs and writes only they use.
+
+        Blobs are deleted only below the oldest channel version a kept checkpoint
+        refers to, and writes only below the oldest kept checkpoint, so a checkpoint
+        written while pruning is never affected. With a TTL configured, the keys that
+        are kept get it refreshed. Returns the number of keys deleted.
+        """
+
+        tid = to_storage_safe_id(thread_id)
+        by_ns = defaultdict(list)
+        for doc in await self._thread_docs(self.checkpoints_index, tid, ["checkpoint_ns", "checkpoint_id"]):
+            by_ns[doc.checkpoint_ns].append(doc.checkpoint_id)
+
+        kept, stale = [], []
+        for ns, ids in by_ns.items():
+            ids.sort(reverse=True)      # checkpoint ids are time ordered
+            kept += [(ns, checkpoint_id) for checkpoint_id in ids[:keep]]
+            stale += [self._make_redis_checkpoint_key(tid, ns, checkpoint_id) for checkpoint_id in ids[keep:]]
+        if not kept:
+            return 0
+
+        pipeline = self._redis.pipeline(transaction=False)
+        for ns, checkpoint_id in kept:
+            pipeline.json().get(self._make_redis_checkpoint_key(tid, ns, checkpoint_id), "$.checkpoint.channel_versions")
+        kept_versions = await pipeline.execute()
+
+        oldest_checkpoint: Dict[str, str] = {}
+        oldest_version: Dict[Tuple[str, str], str] = {}
+        live_keys = []
+        for (ns, checkpoint_id), versions in zip(kept, kept_versions):
+            oldest_checkpoint[ns] = min(oldest_checkpoint.get(ns, checkpoint_id), checkpoint_id)
+            live_keys.append(self._make_redis_checkpoint_key(tid, ns, checkpoint_id))
+            for channel, version in ((versions or [None])[0] or {}).items():
+                version = str(version)
+                oldest_version[(ns, channel)] = min(oldest_version.get((ns, channel), version), version)
+                live_keys.append(self._make_redis_checkpoint_blob_key(tid, ns, channel, version))
+
+        if stale:
+            for doc in await self._thread_docs(self.checkpoint_blobs_index, tid, ["checkpoint_ns", "channel", "version"]):
+                oldest = oldest_version.get((doc.checkpoint_ns, doc.channel))
+                if oldest is not None and doc.version < oldest:
+                    stale.append(self._make_redis_checkpoint_blob_key(tid, doc.checkpoint_ns, doc.channel, doc.version))
+
+            for doc in await self._thread_docs(self.checkpoint_writes_index, tid,
+                                               ["checkpoint_ns", "checkpoint_id", "task_id", "idx"]):
+                oldest = oldest_checkpoint.get(doc.checkpoint_ns)
+                if oldest is not None and doc.checkpoint_id < oldest:
+                    stale.append(self._make_redis_checkpoint_writes_key(
+                        tid, doc.checkpoint_ns, doc.checkpoint_id, doc.task_id, getattr(doc, "idx", 0)))
+
+        ttl_minutes = (self.ttl_config or {}).get("default_ttl")
+        if stale or ttl_minutes:
+            pipeline = self._redis.pipeline(transaction=False)
+            for key in stale:
+                pipeline.delete(key)
+            if ttl_minutes:
+                for key in live_keys:
+                    pipeline.expire(key, int(ttl_minutes * 60))
+            await pipeline.execute()
+        return len(stale)
+
+    async def amemory_report(self, limit: int = 20) -> dict:
+        """Redis memory used by checkpoint keys, in total and for the `limit` largest threads.
+
+        SCANs the whole keyspace, so it is meant for occasional operator use.
+        """
+
+        usage = defaultdict(lambda: [0, 0])      # thread -> [bytes, keys]
+        batch: List[str] = []
+
+        async def measure():
+            pipeline = self._redis.pipeline(transaction=False)
+            for key in batch:
+                pipeline.memory_usage(key)
+            for key, size in zip(batch, await pipeline.execute()):
+                entry = usage[key.split(":", 2)[1]]
+                entry[0] += size or 0
+                entry[1] += 1
+            batch.clear()
+
+        async for key in self._redis.scan_iter(match="checkpoint*", count=1000):
+            batch.append(safely_decode(key))
+            if len(batch) >= 500:
+                await measure()
+        if batch:
+            await measure()
+
+        threads = sorted(usage.items(), key=lambda item: item[1][0], reverse=True)
+        total = sum(size for size, _ in usage.values())
+        return {
+            "threads": len(usage),
+            "total_bytes": total,
+            "avg_bytes_per_thread": total / len(usage) if usage else 0.0,
+            "largest": [{"thread_id": thread_id, "bytes": size, "keys": keys}
+                        for thread_id, (size, keys) in threads[:limit]],
+        }
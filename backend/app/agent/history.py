@@ -0,0 +1,93 @@
+import asyncio
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from ..core.config import settings
+from ..utils.tokenizer import get_tokenizer
+
+
+_tokenizer_loaded = False
+
+
+async def aload_tokenizer():
+    """Load the tokenizer off the event loop; count_tokens would otherwise download it inline
+    (about 20s of retries when the hub is unreachable)"""
+
+    global _tokenizer_loaded
+    if not _tokenizer_loaded:
+        await asyncio.to_thread(get_tokenizer, settings.TOKENIZER_MODEL)
+        _tokenizer_loaded = True
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Approximate token count of `text`"""
+
+    tokenizer = get_tokenizer(settings.TOKENIZER_MODEL)
+    if tokenizer is None:
+        return len(text) // 4 + 1      # rough estimate when the tokenizer cannot be loaded
+    return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def message_tokens(message: BaseMessage) -> int:
+    # Tool call arguments are sent to the LLM too
+    tokens = count_tokens(str(message.content)) + 4
+    for call in getattr(message, "tool_calls", None) or []:
+        tokens += count_tokens(f"{call['name']}{call['args']}")
+    return tokens
+
+
+def history_tokens(messages: Sequence[BaseMessage]) -> int:
+    return sum(message_tokens(m) for m in messages)
+
+
+def trim_history(system: BaseMessage, messages: Sequence[BaseMessage],
+                 max_tokens: int = settings.MAX_HISTORY_TOKENS,
+                 summary: Optional[BaseMessage] = None) -> List[BaseMessage]:
+    """Keep the newest messages that fit in `max_tokens` after the system prompt and running summary.
+
+    The current turn (from the last HumanMessage on) is always kept, and the
+    window always starts at a HumanMessage so no ToolMessage loses its tool call.
+    """
+
+    prefix = [system] if summary is None else [system, summary]
+    budget = max_tokens - history_tokens(prefix)
+    start = len(messages)
+    last_human = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=0)
+
+    for i in range(len(messages) - 1, -1, -1):
+        budget -= message_tokens(messages[i])
+        if budget < 0 and i < last_human:
+            break
+        start = i
+
+    while start < last_human and not isinstance(messages[start], HumanMessage):
+        start += 1
+
+    return [*prefix, *messages[start:]]
+
+
+def split_for_summary(messages: Sequence[BaseMessage],
+                      keep_tokens: int = settings.SUMMARY_KEEP_TOKENS) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+    """Split into (older, recent) for the running summary.
+
+    Like trim_history, the last complete turn (from the last HumanMessage on) is
+    always kept verbatim so follow-up questions can refer to it; `keep_tokens`
+    only bounds how many turns before it are kept too. Recent starts at a HumanMessage.
+    """
+
+    last_human = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=0)
+    budget = keep_tokens
+    start = last_human
+    for i in range(last_human - 1, -1, -1):
+        budget -= message_tokens(messages[i])
+        if budget < 0:
+            break
+        start = i
+
+    while start < last_human and not isinstance(messages[start], HumanMessage):
+        start += 1
+
+    return list(messages[:start]), list(messages[start:])
@@ -1,11 +1,76 @@
-from redis import Redis
-from langgraph.checkpoint.redis import RedisSaver
+import asyncio
+import logging
+from typing import Optional
 
 from ..core.config import settings
+from ..utils.lazy import locked_cache
+from ..core.tracing import span
 
 
-redis_client = Redis.from_url(settings.REDIS_MEMORY_URL)
+logger = logging.getLogger(__name__)
 
-# LangGraph state persistence
-checkpointer = RedisSaver(redis_client=redis_client)        # , ttl=3600
-checkpointer.setup()        # ensures Redis is reachable and initialized
+_setup_lock = asyncio.Lock()
+_setup_done = False
+
+
+@locked_cache
+def get_checkpointer():
+    """LangGraph state persistence in Redis; the client connects on first command"""
+
+    if settings.CHECKPOINTER_BACKEND == "memory":
+        from langgraph.checkpoint.memory import InMemorySaver
+        return InMemorySaver()
+
+    from redis.asyncio import Redis
+    from .checkpoint_store import TracedRedisSaver
+
+    ttl = None
+    if settings.CHECKPOINT_TTL_MINUTES > 0:
+        # Reads do not refresh the TTL (that scans with KEYS); prune_thread does after each request
+        ttl = {"default_ttl": settings.CHECKPOINT_TTL_MINUTES, "refresh_on_read": False}
+
+    redis_client = Redis.from_url(settings.REDIS_MEMORY_URL)
+    return TracedRedisSaver(redis_client=redis_client, ttl=ttl,
+                            compress=settings.CHECKPOINT_COMPRESSION,
+                            compression_level=settings.CHECKPOINT_COMPRESSION_LEVEL)
+
+
+async def ensure_checkpointer():
+    """Create the checkpoint indexes once; retried on the next request if Redis was unreachable"""
+
+    global _setup_done
+    if _setup_done:
+        return get_checkpointer()
+    async with _setup_lock:
+        if not _setup_done:
+            checkpointer = get_checkpointer()
+            if hasattr(checkpointer, "asetup"):
+                await checkpointer.asetup()
+            _setup_done = True
+    return get_checkpointer()
+
+
+def checkpointer_ready() -> bool:
+    return _setup_done
+
+
+async def prune_thread(thread_id: str, keep: int = settings.CHECKPOINT_KEEP_PER_THREAD):
+    """Drop a thread's older checkpoints after its request; failures are only logged"""
+
+    checkpointer = get_checkpointer()
+    if keep <= 0 or not hasattr(checkpointer, "aprune"):
+        return
+    try:
+        with span("checkpoint.prune") as attrs:
+            attrs["deleted_keys"] = await checkpointer.aprune(thread_id, keep)
+    except Exception as e:
+        logger.warning("Could not prune checkpoints of thread %s: %s", thread_id, e)
+
+
+async def memory_report(limit: int = 20) -> Optional[dict]:
+    """Bytes of checkpoint state per thread, or None when the backend cannot report it"""
+
+    checkpointer = get_checkpointer()
+    if not hasattr(checkpointer, "amemory_report"):
+        return None
+    return await checkpointer.amemory_report(limit)
@@ -0,0 +1,87 @@
+import json
+from typing import Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.tools import BaseTool
+
+from ..core.config import settings
+
+
+SYSTEM_PROMPT = (
+    "You are a helpful assistant that answers questions based on retrieved documents.\n"
+    "You have access to the following tools:\n\n"
+    "{tool_descriptions}\n\n"
+    "Use the DocumentSearch tool to find relevant information before answering questions.\n"
+    "Base your answers on the retrieved content.\n"
+    "Be precise and concise.\n"
+    "Use the InterviewBooking tool to help user book an appointment for interview.\n\n"
+
+    "CRITICAL INSTRUCTIONS FOR BOOKING:\n"
+    "1. Use InterviewBooking tool for EVERY booking step\n"
+    "2. If tool returns 'VALIDATION_ERROR: <field>_INVALID', IMMEDIATELY re-ask for SAME field\n"
+    "3. Never proceed to next field until current field passes validation\n"
+    "4. When all fields are validated, tool will confirm booking automatically\n"
+
+    "Follow the following workflow strictly\n"
+    "Booking workflow:\n"
+    "a. Collect name → b. Collect email → c. Schedule date → d. Schedule time\n\n"
+)
+
+TOOL_BUDGET_NOTE = (
+    "The tool budget for this question is used up. Do not call any more tools; "
+    "answer from the information already retrieved, and say so if it is not enough."
+)
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an assistant that answers "
+    "questions from retrieved documents and books interviews.\n"
+    "Update the current summary with the new messages. Keep the user's questions and stated details, the key "
+    "points of the answers and the document facts they relied on, and any booking details and their status. "
+    "Drop greetings, repetition and retrieved text that was not used.\n"
+    "Reply with the updated summary only, as plain prose of at most {max_words} words."
+)
+
+
+def build_system_message(tools: Sequence[BaseTool]) -> SystemMessage:
+    """Render the system prompt once for the given tool set"""
+
+    tool_descriptions = "\n".join(
+        f"- {tool.name}: {tool.description}"
+        for tool in tools
+    )
+    return SystemMessage(content=SYSTEM_PROMPT.format(tool_descriptions=tool_descriptions))
+
+
+def format_transcript(messages: Sequence[BaseMessage],
+                      tool_result_chars: int = settings.SUMMARY_TOOL_RESULT_CHARS) -> str:
+    """Render messages for the summarizer; long tool results are cut to `tool_result_chars`"""
+
+    lines = []
+    for msg in messages:
+        if isinstance(msg, HumanMessage):
+            lines.append(f"User: {msg.content}")
+        elif isinstance(msg, AIMessage):
+            if msg.content:
+                lines.append(f"Assistant: {msg.content}")
+            for call in msg.tool_calls:
+                lines.append(f"Assistant called {call['name']} with {json.dumps(call['args'], default=str)}")
+        elif isinstance(msg, ToolMessage):
+            content = str(msg.content)
+            if len(content) > tool_result_chars:
+                content = content[:tool_result_chars] + " ..."
+            lines.append(f"{msg.name or 'Tool'} returned: {content}")
+    return "\n".join(lines)
+
+
+def build_summary_request(summary: str, messages: Sequence[BaseMessage]) -> list:
+    """Messages asking the model to fold `messages` into the current summary"""
+
+    return [
+        SystemMessage(content=SUMMARY_PROMPT.format(max_words=settings.SUMMARY_MAX_TOKENS * 2 // 3)),
+        HumanMessage(content=f"Current summary:\n{summary or '(none yet)'}\n\n"
+                             f"New messages:\n{format_transcript(messages)}")
+    ]
+
+
+def build_summary_message(summary: str) -> SystemMessage:
+    return SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")
@@ -1,37 +1,47 @@
+import logging
+import time
 from typing import TypedDict, Annotated, Sequence, Optional
 from fastapi import HTTPException
 
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages, BaseMessage
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, ToolMessage
-from langgraph.prebuilt import ToolNode
+from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, ToolMessage, RemoveMessage
 
 from ..agent.tools import VectorSearchTool, InterviewBookingTool
 from langchain_groq import ChatGroq
 from ..core.config import settings
 
-from .cache import init_semantic_cache
-from .memory import checkpointer
-from ..db.session import get_booking_db
+from .cache import answer_cache
+from .memory import get_checkpointer, ensure_checkpointer
+from .prompts import TOOL_BUDGET_NOTE, build_summary_message, build_summary_request, build_system_message
+from .tool_calls import TurnToolExecutor, current_turn, tool_rounds
+from .history import aload_tokenizer, count_tokens, history_tokens, split_for_summary, trim_history
+from ..db.session import SessionLocal_booking, AsyncSessionLocal_booking
+from ..utils.lazy import locked_cache
+from ..core.tracing import event, span
 
 
-MAX_HISTORY = 10
+logger = logging.getLogger(__name__)
+
+
+def update_booking(current: Optional[dict], update: Optional[dict]) -> dict:
+    """Merge newly validated booking fields; None resets after a completed booking"""
+    if update is None:
+        return {}
+    return {**(current or {}), **update}
+
 
 # State schema
 class AgentState(TypedDict):
     query: str
     messages: Annotated[Sequence[BaseMessage], add_messages]
     error_msg: Optional[HTTPException]
+    booking: Annotated[dict, update_booking]        # per-thread booking progress
+    summary: str        # running summary of the turns removed from messages
    
 
-
-# Initialize semantic cache
-# init_semantic_cache(distance_threshold=0.15, ttl=7200)
-
-db = next(get_booking_db())
-
 retriever_tool = VectorSearchTool()
-booking_tool = InterviewBookingTool(db)
+booking_tool = InterviewBookingTool(SessionLocal_booking, AsyncSessionLocal_booking)
 # booking_tool.description = (
 #     "For booking interviews. Call me multiple times as you gather information. "
 #     "I'll guide you through collecting: full_name, email, date, time. "
@@ -49,75 +59,148 @@ booking_tool.description = (
 )
 
 tools = [retriever_tool, booking_tool]
-llm = ChatGroq(
+
+
+@locked_cache
+def get_llm():
+    """Groq chat model with the tools bound, created on first generation"""
+
+    return ChatGroq(
                 temperature=0.1,
                 groq_api_key=settings.GROQ_API_KEY,
                 model_name=settings.LLM_MODEL,
             ).bind_tools(tools=tools)
 
 
-def agent(state: AgentState) -> AgentState:
+@locked_cache
+def get_summary_llm():
+    """Tool-less model that maintains the running conversation summary"""
+
+    return ChatGroq(
+                temperature=0,
+                groq_api_key=settings.GROQ_API_KEY,
+                model_name=settings.LLM_MODEL,
+                max_tokens=settings.SUMMARY_MAX_TOKENS,
+            )
+
+
+# Built once; tools and their descriptions do not change at runtime
+system_message = build_system_message(tools)
+
+
+def cacheable_context(messages: Sequence[BaseMessage], summary: Optional[str] = None) -> Optional[str]:
+    """Retrieved context of the current turn, or None if the answer may not be shared.
+
+    Only the first question of a thread is cached: a follow-up like "and the second
+    one?" means something different in every thread, so the raw question is not a
+    safe cache key once there is history (or a summary of it).
+    """
+
+    turn = current_turn(messages)
+    earlier = messages[:len(messages) - len(turn) - 1]       # before the current question
+    if summary or any(isinstance(m, HumanMessage) for m in earlier):
+        return None
+
+    tool_msgs = [m for m in turn if isinstance(m, ToolMessage)]
+    if not tool_msgs or any(m.name != retriever_tool.name for m in tool_msgs):
+        return None         # nothing retrieved, or a booking turn
+    return "\n\n".join(str(m.content) for m in tool_msgs)
+
+
+async def agent(state: AgentState) -> AgentState:
     """Agent node that decides which tool to call"""
 
-    print("[GRAPH NODE] LLM generation Invoked")
-    
     query = state["query"]
     messages = state.get("messages", [])
 
-    tool_descriptions = "\n".join(
-        f"- {tool.name}: {tool.description}" 
-        for tool in tools
-    )
-
-    system_message = SystemMessage(
-        content="You are a helpful assistant that answers questions based on retrieved documents.\n"
-                "You have access to the following tools:\n\n"
-                "{tool_descriptions}\n\n"
-                "Use the DocumentSearch tool to find relevant information before answering questions.\n"
-                "Base your answers on the retrieved content.\n"
-                "Be precise and concise.\n"
-                "Use the InterviewBooking tool to help user book an appointment for interview.\n\n"
-
-                "CRITICAL INSTRUCTIONS FOR BOOKING:\n"
-                "1. Use InterviewBooking tool for EVERY booking step\n"
-                "2. If tool returns 'VALIDATION_ERROR: <field>_INVALID', IMMEDIATELY re-ask for SAME field\n"
-                "3. Never proceed to next field until current field passes validation\n"
-                "4. When all fields are validated, tool will confirm booking automatically\n"
+    # Older threads stored the system prompt in state; it is now prepended per call
+    if messages and isinstance(messages[0], SystemMessage):
+        messages = messages[1:]
 
+    new_messages = []
+    if not messages or not isinstance(messages[-1], ToolMessage):
+        # Adds human message to the message list if the last message is not a ToolMessage
+        new_messages.append(HumanMessage(content=query))
+    messages = [*messages, *new_messages]
 
-                "Follow the following workflow strictly\n"
-                "Booking workflow:\n"
-                "a. Collect name → b. Collect email → c. Schedule date → d. Schedule time\n\n"
+    # Out of tool rounds: the model has to answer from what it retrieved so far
+    budget_spent = tool_rounds(messages) >= settings.AGENT_MAX_TOOL_ROUNDS
 
-                
-                )
-    
-                
-    human_message = HumanMessage(content=query)
-    if not messages:
-        messages = [system_message, human_message]
-    
-    elif messages and not isinstance(messages[-1], ToolMessage):
-        # Adds human message to the maessage list if the last message is not a ToolMessage
-        messages = messages + [human_message]
     try:
-        trimmed_msg = [messages[0]] + messages[-(MAX_HISTORY - 1):]
-        response = llm.invoke(trimmed_msg)
-        print(response)
-        if hasattr(response, "tool_calls") and response.tool_calls:
-            print(f"Using Tools: {[tc['name'] for tc in response.tool_calls]}")
-        trimmed_msg = trimmed_msg + [response]
-        
-        return {"messages": trimmed_msg,
+        await aload_tokenizer()
+        summary = state.get("summary")
+        trimmed_msg = trim_history(system_message, messages,
+                                   summary=build_summary_message(summary) if summary else None)
+        llm = get_llm()
+        if budget_spent:
+            trimmed_msg.append(SystemMessage(content=TOOL_BUDGET_NOTE))
+            llm = llm.bind(tool_choice="none")
+
+        context = cacheable_context(messages, summary) if answer_cache else None
+        cached = None
+        if context:
+            with span("semantic_cache.lookup") as attrs:
+                cached = await answer_cache.alookup(query, context)
+                attrs["hit"] = cached is not None
+        if cached is not None:
+            response = AIMessage(content=cached)
+        else:
+            start = time.perf_counter()
+            response = await llm.ainvoke(trimmed_msg)
+            if budget_spent and response.tool_calls:
+                # Unanswered tool calls would also break the thread's next turn
+                response = AIMessage(content=response.content or "I could not find enough information to answer that.")
+            # A forced answer after the tool budget ran out is not worth reusing
+            if context and not response.tool_calls and not budget_spent:
+                await answer_cache.aupdate(query, context, response.content, (time.perf_counter() - start) * 1000)
+        event("agent.response", history_messages=len(trimmed_msg), cached=cached is not None, budget_spent=budget_spent,
+              tool_calls=[tc["name"] for tc in getattr(response, "tool_calls", None) or []])
+        new_messages.append(response)
+
+        return {"messages": new_messages,
                 "query": query,
                 "error_msg": None
             }        
 
     except Exception as e:
-        print(f"Error in ask_agent: {e}")
+        logger.exception("Agent LLM call failed: %s", e)
         return {"error_msg": HTTPException(status_code=503, detail="LLM service temporarily unavailable. Please try again.")}
     
 
+async def needs_summary(state: AgentState) -> str:
+    """Route a new question through summarize once the stored history passes the token threshold"""
+
+    if settings.SUMMARY_ENABLED:
+        await aload_tokenizer()
+    if settings.SUMMARY_ENABLED and history_tokens(state.get("messages", [])) > settings.SUMMARY_TRIGGER_TOKENS:
+        return "summarize"
+    return "agent"
+
+
+async def summarize(state: AgentState) -> AgentState:
+    """Fold the older turns into the running summary and remove them from the thread's messages.
+
+    Only the messages since the last summary are sent, together with the current
+    summary, so each call costs about the same however long the thread gets.
+    """
+
+    older, recent = split_for_summary(state["messages"])
+    if not older:
+        return {}
+
+    try:
+        with span("summarize", messages=len(older), kept=len(recent)) as attrs:
+            response = await get_summary_llm().ainvoke(build_summary_request(state.get("summary", ""), older))
+            summary = str(response.content).strip()
+            attrs["summary_tokens"] = count_tokens(summary)
+    except Exception as e:
+        # trim_history still bounds the prompt; the next question retries
+        logger.warning("Conversation summary failed: %s", e)
+        return {}
+
+    return {"summary": summary, "messages": [RemoveMessage(id=msg.id) for msg in older]}
+
+
 def should_continue(state: AgentState) -> AgentState:
     """Decide whether the agent should continue tool calling"""
 
@@ -128,23 +211,46 @@ def should_continue(state: AgentState) -> AgentState:
     return "exit"
 
 
-    
 
-graph = StateGraph(AgentState)
+def build_graph() -> StateGraph:
+    graph = StateGraph(AgentState)
+
+    graph.add_node("agent", agent)
+    graph.add_node("summarize", summarize)
+
+    tool_node = TurnToolExecutor(
+        tools,
+        memoize=[retriever_tool.name],      # read-only; a repeated search returns the same chunks
+        sequential=[booking_tool.name],     # each booking step reads the previous one's state
+        reducers={"booking": update_booking}
+    )
+    graph.add_node("tools", tool_node)
+
+
+    graph.add_conditional_edges(START, needs_summary,
+                                {
+                                    "summarize": "summarize",
+                                    "agent": "agent"
+                                })
+    graph.add_edge("summarize", "agent")
+    graph.add_conditional_edges("agent", should_continue, 
+                                {
+                                    "tools": "tools",
+                                    "exit": END
+                                })
+    graph.add_edge("tools", "agent")
+    return graph
 
-graph.add_node("agent", agent)
 
-tool_node = ToolNode(tools)
-graph.add_node("tools", tool_node)
+@locked_cache
+def get_rag_app():
+    """Compile the graph on first use instead of at import"""
 
+    return build_graph().compile(checkpointer=get_checkpointer())
 
-graph.add_edge(START, "agent")
-graph.add_conditional_edges("agent", should_continue, 
-                            {
-                                "tools": "tools",
-                                "exit": END
-                            })
-graph.add_edge("tools", "agent")
 
+async def aget_rag_app():
+    """The compiled graph, with the Redis checkpointer initialized"""
 
-rag_app = graph.compile(checkpointer=checkpointer)
\ No newline at end of file
+    await ensure_checkpointer()
+    return get_rag_app()
\ No newline at end of file
@@ -0,0 +1,144 @@
+import asyncio
+import dataclasses
+import json
+from typing import Callable, Dict, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from langgraph.prebuilt import ToolNode
+from langgraph.types import Command
+
+from ..core.metrics import TOOL_CALLS_DEDUPLICATED
+from ..core.tracing import event
+from ..embedding.cache import normalize_query
+
+
+def current_turn(messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+    """Messages after the last HumanMessage, i.e. the agent <-> tools steps of the current question"""
+
+    turn = []
+    for msg in reversed(messages):
+        if isinstance(msg, HumanMessage):
+            break
+        turn.append(msg)
+    return turn[::-1]
+
+
+def tool_rounds(messages: Sequence[BaseMessage]) -> int:
+    """How many times the agent has called tools for the current question"""
+
+    return sum(1 for msg in current_turn(messages) if isinstance(msg, AIMessage) and msg.tool_calls)
+
+
+def call_key(call: dict) -> str:
+    """Identity of a tool call; string arguments compare like the retrieval cache keys"""
+
+    args = {k: normalize_query(v) if isinstance(v, str) else v for k, v in call["args"].items()}
+    return f"{call['name']}\0{json.dumps(args, sort_keys=True, default=str)}"
+
+
+class TurnToolExecutor:
+    """Graph node that runs the last AIMessage's tool calls.
+
+    Calls to `memoize` tools (read-only, like DocumentSearch) that repeat an earlier
+    call of the same question, or another call in the same step, are answered with
+    the earlier result instead of running again. The remaining independent calls
+    run concurrently; calls to `sequential` tools (which read and update graph
+    state, like InterviewBooking) run one after another, each seeing the state
+    updates of the previous one through `reducers`.
+    """
+
+    def __init__(self, tools: Sequence[BaseTool], memoize: Sequence[str] = (),
+                 sequential: Sequence[str] = (), reducers: Optional[Dict[str, Callable]] = None):
+        # Not named "tools": the graph node of that name is this executor, not the inner ToolNode
+        self._node = ToolNode(tools, name="tool_calls")
+        self.memoize = set(memoize)
+        self.sequential = set(sequential)
+        self.reducers = reducers or {}
+
+    def _earlier_results(self, messages: Sequence[BaseMessage]) -> Dict[str, str]:
+        """call_key -> result of the memoizable calls already answered in this turn"""
+
+        keys = {call["id"]: call_key(call)
+                for msg in messages if isinstance(msg, AIMessage)
+                for call in msg.tool_calls if call["name"] in self.memoize}
+        results = {}
+        for msg in messages:
+            if isinstance(msg, ToolMessage) and msg.tool_call_id in keys and msg.status != "error":
+                results.setdefault(keys[msg.tool_call_id], msg.content)
+        return results
+
+    def _with_calls(self, state: dict, calls: List[dict]) -> dict:
+        """The state as ToolNode expects it, with only `calls` left on the last AIMessage"""
+
+        last = state["messages"][-1]
+        return {**state, "messages": [*state["messages"][:-1], last.model_copy(update={"tool_calls": calls})]}
+
+    async def _run_sequential(self, state: dict, calls: List[dict], config: RunnableConfig) -> list:
+        state = dict(state)
+        outputs = []
+        for call in calls:
+            output = await self._node.ainvoke(self._with_calls(state, [call]), config)
+            output = output if isinstance(output, list) else [output]
+            for item in output:
+                update = item.update if isinstance(item, Command) else item
+                for field, reducer in self.reducers.items():
+                    if field in (update or {}):
+                        state[field] = reducer(state.get(field), update[field])
+            outputs.extend(output)
+        return outputs
+
+    async def _run_parallel(self, state: dict, calls: List[dict], config: RunnableConfig) -> list:
+        # ToolNode.ainvoke gathers the calls' _arun coroutines
+        output = await self._node.ainvoke(self._with_calls(state, calls), config)
+        return output if isinstance(output, list) else [output]
+
+    async def __call__(self, state: dict, config: RunnableConfig):
+        calls = state["messages"][-1].tool_calls
+        earlier = self._earlier_results(current_turn(state["messages"][:-1]))
+
+        to_run, duplicates, first_call = [], [], {}
+        for call in calls:
+            if call["name"] in self.memoize:
+                key = call_key(call)
+                if key in earlier or key in first_call:
+                    duplicates.append((call, key))
+                    continue
+                first_call[key] = call["id"]
+            to_run.append(call)
+
+        parallel = [call for call in to_run if call["name"] not in self.sequential]
+        sequential = [call for call in to_run if call["name"] in self.sequential]
+        runs = []
+        if parallel:
+            runs.append(self._run_parallel(state, parallel, config))
+        if sequential:
+            runs.append(self._run_sequential(state, sequential, config))
+        outputs = [item for output in await asyncio.gather(*runs) for item in output]
+
+        # One message list for all calls; the rest of each Command's update is applied after it, in order
+        messages, commands = [], []
+        for item in outputs:
+            update = (item.update if isinstance(item, Command) else item) or {}
+            messages.extend(update.get("messages", []))
+            if isinstance(item, Command):
+                rest = {k: v for k, v in update.items() if k != "messages"}
+                if rest or item.goto:
+                    commands.append(dataclasses.replace(item, update=rest))
+
+        if duplicates:
+            by_id = {msg.tool_call_id: msg for msg in messages if isinstance(msg, ToolMessage)}
+            for call, key in duplicates:
+                content = earlier[key] if key in earlier else by_id[first_call[key]].content
+                messages.append(ToolMessage(content=content, name=call["name"], tool_call_id=call["id"]))
+                TOOL_CALLS_DEDUPLICATED.labels(call["name"]).inc()
+
+        order = {call["id"]: i for i, call in enumerate(calls)}
+        messages.sort(key=lambda msg: order.get(getattr(msg, "tool_call_id", None), len(order)))
+        event("tools.executed", calls=len(calls), ran=len(to_run), deduplicated=len(duplicates),
+              concurrent=len(parallel))
+
+        if not commands:
+            return {"messages": messages}
+        return [{"messages": messages}, *commands]
@@ -1,19 +1,34 @@
-from typing import Optional
+import asyncio
+import logging
+from typing import Annotated, List, Optional
 from langchain.tools import BaseTool
-from pinecone import Pinecone
+from langchain_core.tools import InjectedToolCallId
+from langchain_core.messages import ToolMessage
+from langgraph.prebuilt import InjectedState
+from langgraph.types import Command
 from ..core.config import settings
-from ..embedding.embedder import hf
+from ..embedding.embedder import embed_query
+from ..embedding.reranker import CrossEncoderReranker, reranker as default_reranker
+from ..vectorstore.base import VectorStore
+from ..vectorstore.factory import get_vector_store, get_sparse_index
+from ..vectorstore.bm25 import BM25Index, reciprocal_rank_fusion
+from ..vectorstore.cache import retrieval_cache
+from ..core.tracing import event, span
 from pydantic import Field, PrivateAttr, ValidationError, BaseModel
 from ..core.schemas import BookingRequest
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from ..db.models.booking_db import BookingInfo
-from ..utils.send_mail import send_email
+from ..utils.outbox import queue_confirmation_email
 
 import re
 from datetime import datetime, date
 
 
+logger = logging.getLogger(__name__)
+
+
 class VectorSearchTool(BaseTool):
     """Tool for searching a vector db to retrieve semantically similar chunks"""
 
@@ -24,49 +39,98 @@ class VectorSearchTool(BaseTool):
         "to answer questions. Input should be a clear search query or question."
     )
     # query: str = Field()
-    method: str = Field(default="cosine", description="The algorithm for semantic similarity search.")
+    top_k: int = Field(default=3, description="Number of chunks to retrieve.")
 
-    _client: Pinecone = PrivateAttr()
+    _store: Optional[VectorStore] = PrivateAttr()
+    _sparse: Optional[BM25Index] = PrivateAttr()
+    _reranker: Optional[CrossEncoderReranker] = PrivateAttr()
 
-    def __init__(self, method: str = "cosine"):
+    def __init__(self, store: Optional[VectorStore] = None,
+                 sparse_index: Optional[BM25Index] = None,
+                 reranker: Optional[CrossEncoderReranker] = None):
         super().__init__()
-        try:
-            pc = Pinecone(api_key=settings.PINECONE_API_KEY)
-            self._client = pc.Index("file-embeddings-dense")
-            self.method = method
-        except Exception as e:
-            print(f"Error initializing Pinecone client: {e}")
-            raise
+        self._store = store         # connected on first search, not at import
+        self._sparse = sparse_index or (get_sparse_index() if settings.HYBRID_SEARCH_ENABLED else None)
+        self._reranker = reranker or default_reranker
 
-    def _run(self, query: str) -> str:
-        """Execute the vector search"""
-        print(f"[TOOL CALL] VectorSearchTool was invoked with query: {query}")
-        query_embed = hf.embed_query(query)
-
-        results = self._client.query(
-            # namespace=settings.PINECONE_NAMESPACE
-            vector=query_embed,
-            top_k=3,
-            include_metadata=True,
-            metric=self.method,
-            include_values=False
-        )
+    @property
+    def store(self) -> VectorStore:
+        if self._store is None:
+            try:
+                self._store = get_vector_store()
+            except Exception as e:
+                logger.error("Error initializing vector store: %s", e)
+                raise
+        return self._store
+
+    def _search(self, query: str, query_embed: List[float]) -> str:
+        """Query the index and join the matched chunk texts.
+
+        With a sparse index, dense and BM25 candidates are fused by reciprocal rank,
+        so exact names and codes that embed poorly still reach the top_k. With a
+        reranker, the top RERANK_CANDIDATES are reordered by the cross-encoder.
+        """
+
+        candidates = self.top_k
+        if self._sparse is not None:
+            candidates = max(candidates, settings.HYBRID_CANDIDATES)
+        if self._reranker is not None:
+            candidates = max(candidates, settings.RERANK_CANDIDATES)
+        keep = candidates if self._reranker is not None else self.top_k
+        with span("vector.query", top_k=candidates):
+            results = self.store.query(
+                vector=query_embed,
+                top_k=candidates,
+                include_metadata=True
+            )
+        metadata = {m.id: m.metadata for m in results.matches}
+        ranked = list(metadata)
+
+        if self._sparse is not None:
+            with span("bm25.search", top_k=candidates):
+                sparse_ids = [doc_id for doc_id, _ in self._sparse.search(query, candidates)]
+            ranked = reciprocal_rank_fusion([ranked, sparse_ids], k=settings.RRF_K)
+            missing = [doc_id for doc_id in ranked[:keep] if doc_id not in metadata]
+            if missing:
+                with span("vector.fetch", ids=len(missing)):
+                    metadata.update(self.store.fetch(missing))
+        ranked = [doc_id for doc_id in ranked if doc_id in metadata][:keep]
 
-        matches = getattr(results, "matches", []) 
-        if not matches:
+        if not ranked:
             return "No matching content found."
 
-        chunks = [m.metadata.get("text", "") for m in matches if "text" in m.metadata]
+        if self._reranker is not None and len(ranked) > 1:
+            with span("rerank") as attrs:
+                order, report = self._reranker.rerank(query, [metadata[doc_id].get("text", "") for doc_id in ranked], self.top_k)
+                attrs.update(report)
+            ranked = [ranked[i] for i in order]
+        ranked = ranked[:self.top_k]
+
+        chunks = [metadata[doc_id]["text"] for doc_id in ranked if "text" in metadata[doc_id]]
         if not chunks:
             return "No text metadata found in the results."
 
-        print(f"Retrieving {len(chunks)} document chunks")
+        event("retrieval.chunks", count=len(chunks))
         return "\n\n".join(chunks)
-    
 
-    # async def _arun(self, query: str) -> str:
-    #     """Async version of the tool"""
-    #     return self._run(query)
+    def _run(self, query: str) -> str:
+        """Execute the vector search"""
+        with span("retrieval", query=query, top_k=self.top_k) as attrs:
+            version = retrieval_cache.version.get()       # read once: the search may race an upload
+            cached = retrieval_cache.get(query, self.top_k, version)
+            attrs["cache_hit"] = cached is not None
+            if cached is not None:
+                return cached
+
+            with span("embed_query"):
+                query_embed = embed_query(query)
+            result = self._search(query, query_embed)
+            retrieval_cache.set(query, self.top_k, version, result)
+            return result
+
+    async def _arun(self, query: str) -> str:
+        """Async version of the tool; the CPU embedding and blocking vector store call run in a worker thread"""
+        return await asyncio.to_thread(self._run, query)
 
 
 class InterviewBookingTool(BaseTool):
@@ -84,16 +148,29 @@ class InterviewBookingTool(BaseTool):
         email: Optional[str] = Field(None, description="Interviewee's email address")
         date: Optional[str] = Field(None, description="Interview date (YYYY-MM-DD)")
         time: Optional[str] = Field(None, description="Interview time (e.g., 9am)")
+        # Hidden from the LLM; validated data between calls lives in the thread's graph state
+        state: Annotated[dict, InjectedState]
+        tool_call_id: Annotated[str, InjectedToolCallId]
 
     args_schema: type[BaseModel] = BookingToolArgs
 
-    _db: Session = PrivateAttr()
-    _collected_data: dict = PrivateAttr()  # Track validated data between calls
+    _session_factory: sessionmaker = PrivateAttr()
+    _async_session_factory: Optional[async_sessionmaker] = PrivateAttr()
 
-    def __init__(self, db: Session):
+    def __init__(self, session_factory: sessionmaker,
+                 async_session_factory: Optional[async_sessionmaker] = None):
         super().__init__()
-        self._db = db
-        self._collected_data = {}
+        # A pooled session is checked out per booking instead of sharing one long-lived Session
+        self._session_factory = session_factory
+        self._async_session_factory = async_session_factory
+
+    def _reply(self, tool_call_id: str, content: str, booking_update: Optional[dict]) -> Command:
+        """Return the tool result plus the change to the thread's booking state (None clears it)"""
+
+        update = {"messages": [ToolMessage(content=content, name=self.name, tool_call_id=tool_call_id)]}
+        if booking_update is None or booking_update:
+            update["booking"] = booking_update
+        return Command(update=update)
 
     def _validate_name(self, name: str) -> str:
         """Validate full name format"""
@@ -138,15 +215,18 @@ class InterviewBookingTool(BaseTool):
         raise ValueError("Invalid time format. Use formats like '9am', '2:30pm', or '14:30'")
     
 
-    def _run(self, **kwargs):
-        """Handle step-by-step booking with validation"""
+    def _collect(self, state: dict, tool_call_id: str, fields: dict):
+        """Validate the new fields; returns (collected_data, None) once complete, else (None, reply)"""
 
-        for field, value in kwargs.items():
+        collected_data = dict(state.get("booking") or {})
+        validated = {}
+
+        for field, value in fields.items():
             if value is None or value == "":
                 continue
                 
             try:
-                print(f"Validating {field}: {value}")
+                logger.debug("Validating %s: %s", field, value)
                 if field == "full_name":
                     validated_value = self._validate_name(value)
                 elif field == "email":
@@ -158,21 +238,16 @@ class InterviewBookingTool(BaseTool):
                 else:
                     continue  # Skip unknown fields
                 
-                self._collected_data[field] = validated_value
+                validated[field] = validated_value
                 
             except ValueError as e:
-                return f"VALIDATION_ERROR: {field.upper()}_INVALID - {str(e)}"
-                error_responses = {
-                    "full_name": f"Invalid name: {e}. Please provide your full name again.",
-                    "email": f"Invalid email: {e}. Please provide a valid email address.",
-                    "date": f"Invalid date: {e}. Please provide a future date (YYYY-MM-DD).",
-                    "time": f"Invalid time: {e}. Please provide a valid time (e.g., 9am or 14:30)."
-                }
-                return error_responses[field]
+                return None, self._reply(tool_call_id, f"VALIDATION_ERROR: {field.upper()}_INVALID - {str(e)}", validated)
+
 
+        collected_data.update(validated)
 
         required_fields = ["full_name", "email", "date", "time"]
-        missing = [f for f in required_fields if f not in self._collected_data]
+        missing = [f for f in required_fields if f not in collected_data]
         
         if missing:
             next_field = missing[0]
@@ -182,38 +257,71 @@ class InterviewBookingTool(BaseTool):
                 "date": "When would you like to schedule? (YYYY-MM-DD)",
                 "time": "What time works for you? (e.g., 9am or 14:30)"
             }
-            return prompts[next_field]
-        
+            return None, self._reply(tool_call_id, prompts[next_field], validated)
+
+        return collected_data, None
+
+    def _stage_booking(self, db, collected_data: dict):
+        """Add the booking and its confirmation email to one transaction"""
+
+        db.add(BookingInfo(**collected_data))
+        queue_confirmation_email(
+            db,
+            full_name=collected_data["full_name"],
+            receiver_email=collected_data["email"],
+            date=collected_data["date"],
+            time=collected_data["time"]
+        )
+
+    def _confirm(self, tool_call_id: str, collected_data: dict) -> Command:
+        """Clear the thread's booking state and summarize the booking"""
+
+        # Clear collected data for next booking
+        return self._reply(
+            tool_call_id,
+            "Booking confirmed!\n\n"
+            f"• Name: {collected_data['full_name']}\n"
+            f"• Email: {collected_data['email']}\n"
+            f"• Date: {collected_data['date']}\n"
+            f"• Time: {collected_data['time']}\n\n"
+            "A confirmation email is on its way!",
+            None
+        )
+
+    def _run(self, state: dict, tool_call_id: str, **kwargs) -> Command:
+        """Handle step-by-step booking with validation"""
+
+        collected_data, reply = self._collect(state, tool_call_id, kwargs)
+        if reply is not None:
+            return reply
+
         try:
-            booking = BookingInfo(**self._collected_data)
-            self._db.add(booking)
-            self._db.commit()
-
-            send_email(
-                full_name=self._collected_data["full_name"],
-                receiver_email=self._collected_data["email"],
-                date=self._collected_data["date"],
-                time=self._collected_data["time"]
-            )
-            
-            # Clear collected data for next booking
-            self._collected_data = {}
-            
-            return (
-                "Booking confirmed!\n\n"
-                f"• Name: {booking.full_name}\n"
-                f"• Email: {booking.email}\n"
-                f"• Date: {booking.date}\n"
-                f"• Time: {booking.time}\n\n"
-                "A confirmation email has been sent!"
-            )
-            
+            with span("booking.db"), self._session_factory() as db:
+                self._stage_booking(db, collected_data)
+                db.commit()
+
+            return self._confirm(tool_call_id, collected_data)
+
         except Exception as e:
-            return f"Error completing booking: {str(e)}"
+            return self._reply(tool_call_id, f"Error completing booking: {str(e)}", collected_data)
 
-        
+    async def _arun(self, state: dict, tool_call_id: str, **kwargs) -> Command:
+        """Async version; uses the async engine when configured, else runs _run in a worker thread"""
 
+        if self._async_session_factory is None:
+            return await asyncio.to_thread(self._run, state, tool_call_id, **kwargs)
 
+        collected_data, reply = self._collect(state, tool_call_id, kwargs)
+        if reply is not None:
+            return reply
 
+        try:
+            with span("booking.db"):
+                async with self._async_session_factory() as db:
+                    self._stage_booking(db, collected_data)
+                    await db.commit()
 
+            return self._confirm(tool_call_id, collected_data)
 
+        except Exception as e:
+            return self._reply(tool_call_id, f"Error completing booking: {str(e)}", collected_data)
@@ -1,16 +1,129 @@
+import logging
+from typing import Optional
+
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, status
 from sqlalchemy.orm import Session
-from ..db.session import get_db
-from ..utils.file_utils import extract_text, chunk_text
-from pinecone import Pinecone, ServerlessSpec
+from ..db.session import get_db, SessionLocal_file
+from ..utils.file_utils import extract_text
 from ..core.config import settings
-from ..embedding.embedder import create_embeddings
+from ..ingestion.pipeline import ingest_documents, content_hash
+from ..ingestion.jobs import job_queue, IngestionJob, QueueFullError, DuplicateJobError
+from ..vectorstore.factory import get_vector_store, get_sparse_index
+from ..vectorstore.cache import corpus_version
 from ..db.models import file_db
+from ..core.metrics import INGESTED_CHUNKS
+from ..core.tracing import event
+
+
+logger = logging.getLogger(__name__)
 
 
 router = APIRouter()
 
-@router.post('/file')
+
+def discard_partial_ingestion(store, sparse, file_id: int, recorded) -> int:
+    """Delete vectors a failed ingestion upserted but never recorded in file_chunk"""
+
+    prefix = f"{file_id}-"
+    if sparse is not None:
+        # First, so the BM25 index is saved (and reloadable) even if the vector store is down
+        sparse.delete([doc_id for doc_id in sparse.ids(prefix) if doc_id not in recorded])
+        sparse.save()
+
+    orphans = [vec_id for vec_id in store.list_ids(prefix=prefix) if vec_id not in recorded]
+    if orphans:
+        store.delete(orphans)
+    return len(orphans)
+
+
+def process_upload(job: IngestionJob, contents: bytes, filename: str, file_hash: str,
+                   file_id: Optional[int] = None) -> int:
+    """Extract, embed and upsert an uploaded file, then record its metadata.
+
+    When `file_id` refers to an earlier version of the file, only chunks whose
+    content changed are embedded, and vectors of removed chunks are deleted.
+    """
+
+    docs = extract_text(contents, filename)       # lazy: pages stream into chunking
+
+    method = settings.CHUNKING_METHOD
+    if filename.endswith('txt') and len(contents) >= settings.FAST_CHUNKING_MIN_BYTES:
+        method = "fast"         # vectorized path for large plain-text files
+
+    store = get_vector_store()
+    sparse = get_sparse_index() if settings.HYBRID_SEARCH_ENABLED else None
+    db = SessionLocal_file()
+    entry, previous, created = None, {}, False
+    try:
+        if file_id is None:
+            # An earlier job for this name may have finished since the upload request looked
+            entry = db.query(file_db.FileMetadata).filter(file_db.FileMetadata.filename == filename).first()
+        else:
+            entry = db.get(file_db.FileMetadata, file_id)
+        if entry is None:
+            entry = file_db.FileMetadata(filename=filename)
+            db.add(entry)
+            db.commit()
+            created = True
+
+        previous = {
+            chunk.chunk_id: chunk
+            for chunk in db.query(file_db.FileChunk).filter(file_db.FileChunk.file_id == entry.id)
+        }
+        if not created and not previous:
+            logger.warning("File %s (id %s) predates chunk tracking; its old vectors stay searchable until "
+                           "`python -m app.db.migrations --purge-legacy-vectors` is run", filename, file_id)
+
+        result = ingest_documents(
+            docs, store, method=method, on_progress=job.update_progress,
+            file_key=str(entry.id), existing_ids=previous.keys(), sparse_index=sparse
+        )
+
+        current = dict(result["chunk_ids"])
+        removed = [chunk_id for chunk_id in previous if chunk_id not in current]
+        if removed:
+            store.delete(removed)
+            if sparse is not None:
+                sparse.delete(removed)
+        if sparse is not None:
+            sparse.save()
+        for chunk_id in removed:
+            db.delete(previous[chunk_id])
+        db.add_all(
+            file_db.FileChunk(file_id=entry.id, chunk_id=chunk_id, chunk_hash=chunk_hash)
+            for chunk_id, chunk_hash in current.items() if chunk_id not in previous
+        )
+
+        # Update database
+        entry.content_hash = file_hash
+        entry.chunking_method = method
+        entry.embedding_model = settings.EMBEDDING_MODEL
+        db.commit()
+
+        corpus_version.bump()       # invalidates cached retrievals
+        INGESTED_CHUNKS.labels("embedded").inc(result["chunks"])
+        INGESTED_CHUNKS.labels("skipped").inc(result["skipped"])
+        INGESTED_CHUNKS.labels("removed").inc(len(removed))
+        event("ingestion.result", filename=filename, file_id=entry.id, embedded=result["chunks"],
+              skipped=result["skipped"], removed=len(removed))
+        return entry.id
+    except Exception:
+        db.rollback()
+        if entry is not None:
+            try:
+                discarded = discard_partial_ingestion(store, sparse, entry.id, previous)
+                if created:
+                    db.delete(entry)        # no half-ingested file is left to be found by name
+                    db.commit()
+                logger.info("Rolled back failed ingestion of %s: %d vectors discarded", filename, discarded)
+            except Exception as e:
+                logger.error("Could not roll back failed ingestion of %s: %s", filename, e)
+        raise
+    finally:
+        db.close()
+
+
+@router.post('/file', status_code=status.HTTP_202_ACCEPTED)
 async def upload_file(file: UploadFile = File(), db: Session = Depends(get_db)):
     
     # Validate file type
@@ -18,51 +131,40 @@ async def upload_file(file: UploadFile = File(), db: Session = Depends(get_db)):
     if file.content_type not in allowed_types:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file types. Allowed file types are .pdf and .txt")
     
-    existing_file = db.query(file_db.FileMetadata).filter(file_db.FileMetadata.filename == file.filename).first()
-    if existing_file:
-        return {
-            "message": "File already exists in the database. Skipping Pinecone upsert.",
-            "file_id": existing_file.id
-        }
-    
     contents = await file.read()
+    filename = file.filename
+    file_hash = content_hash(contents)
 
-    text = extract_text(contents, file.filename)
-    chunks = chunk_text(text, method="recursive")
-    vectors = create_embeddings(chunks)
-
-    pc = Pinecone(settings.PINECONE_API_KEY)
-
-    index_name = "file-embeddings-dense"
-    if not pc.has_index(index_name):
-        pc.create_index(
-            name=index_name,
-            vector_type="dense",
-            dimension=384,
-            metric="cosine",
-            spec=ServerlessSpec(
-                cloud="aws",
-                region="us-east-1"
-            )
-        )
-
-    index = pc.Index(index_name)
+    same_content = db.query(file_db.FileMetadata).filter(file_db.FileMetadata.content_hash == file_hash).first()
+    if same_content:
+        return {
+            "message": "File with identical content already exists in the database. Skipping vector store upsert.",
+            "file_id": same_content.id
+        }
 
-    index.upsert(vectors=vectors)
+    # Same name, different content: re-index only the chunks that changed
+    existing_file = db.query(file_db.FileMetadata).filter(file_db.FileMetadata.filename == filename).first()
+    file_id = existing_file.id if existing_file else None
 
-    # Update database
-    new_entry = file_db.FileMetadata(
-        filename=file.filename,
-        chunking_method=settings.CHUNKING_METHOD,
-        embedding_model=settings.EMBEDDING_MODEL
-        )
-    
-    db.add(new_entry)
-    db.commit()
-    db.refresh(new_entry)
+    try:
+        job = job_queue.submit(filename, lambda job: process_upload(job, contents, filename, file_hash, file_id))
+    except QueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+    except DuplicateJobError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
     return {
-        "message": "Embeddings are inserted and metadata is saved.",
-        "file_id": new_entry.id
+        "message": "File accepted for re-ingestion." if file_id else "File accepted for ingestion.",
+        "job_id": job.id,
+        "status": job.status
     }
 
+
+@router.get('/jobs/{job_id}')
+async def get_job_status(job_id: str):
+
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    return job.to_dict()
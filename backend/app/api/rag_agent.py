@@ -1,21 +1,43 @@
-from fastapi import APIRouter, Header
+import json
+import logging
+
+from fastapi import APIRouter, BackgroundTasks, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from ..core.schemas import BookingRequest, QueryString
 from sqlalchemy.orm import Session
 from ..db.session import get_db
-from ..agent.rag_graph import rag_app
+from ..agent.rag_graph import aget_rag_app, tools
+from ..agent.callbacks import GraphMetricsHandler
+from ..agent.cache import answer_cache
+from ..agent.memory import memory_report, prune_thread
+from ..embedding.embedder import query_cache
+from ..embedding.reranker import reranker
+from ..vectorstore.cache import retrieval_cache
 from langchain_core.messages import AIMessage
+from langgraph.types import Command
+
+
+logger = logging.getLogger(__name__)
 
 
 router = APIRouter()
 
 
 @router.post('/query')
-async def ask_agent(request: QueryString, thread_id: str = Header(..., description="Unique conversation ID")): 
+async def ask_agent(request: QueryString, background_tasks: BackgroundTasks,
+                    thread_id: str = Header(..., description="Unique conversation ID")): 
     
-    response = rag_app.invoke(
-        {"query": request.question},
-        config={"thread_id": thread_id}
-        )
+    rag_app = await aget_rag_app()
+    graph_metrics = GraphMetricsHandler()
+    try:
+        response = await rag_app.ainvoke(
+            {"query": request.question},
+            config={"thread_id": thread_id, "callbacks": [graph_metrics]}
+            )
+    finally:
+        graph_metrics.finish()
+    background_tasks.add_task(prune_thread, thread_id)
     # result = response['messages'][-1].content
     for msg in reversed(response["messages"]):
         if isinstance(msg, AIMessage):
@@ -23,6 +45,96 @@ async def ask_agent(request: QueryString, thread_id: str = Header(..., descripti
     return {"result": "No response from the agent"}
 
 
+@router.get('/cache/stats')
+async def cache_stats():
+    """Hit rates of the query embedding, retrieval and semantic answer caches, and rerank latency"""
+
+    return {
+        "query_embedding": query_cache.stats(),
+        "retrieval": retrieval_cache.stats(),
+        "semantic_answer": answer_cache.stats() if answer_cache else None,
+        "rerank": reranker.stats() if reranker else None
+    }
+
+
+@router.get('/memory/report')
+async def checkpoint_memory(limit: int = 20):
+    """Redis memory held by conversation checkpoints, per thread (scans the keyspace)"""
+
+    report = await memory_report(limit)
+    if report is None:
+        raise HTTPException(status_code=404, detail="The configured checkpointer does not report memory usage")
+    return report
+
+
+# Arguments the model chose; injected ones (graph state, tool_call_id) must not reach the client
+TOOL_ARGS = {tool.name: set(tool.tool_call_schema.model_fields) for tool in tools}
+
+
+def _tool_args(name: str, tool_input) -> dict:
+    """The model-provided arguments of a tool call"""
+
+    if isinstance(tool_input, dict) and tool_input.get("type") == "tool_call":
+        tool_input = tool_input.get("args", {})
+    if not isinstance(tool_input, dict):
+        return {}
+    allowed = TOOL_ARGS.get(name, set())
+    return {k: v for k, v in tool_input.items() if k in allowed}
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format a Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post('/query/stream')
+async def ask_agent_stream(request: QueryString, thread_id: str = Header(..., description="Unique conversation ID")):
+    """Stream LLM tokens and tool activity as Server-Sent Events"""
+
+    async def event_stream():
+        graph_metrics = GraphMetricsHandler()
+        try:
+            rag_app = await aget_rag_app()
+            async for event in rag_app.astream_events(
+                {"query": request.question},
+                config={"thread_id": thread_id, "callbacks": [graph_metrics]},
+                version="v2"
+            ):
+                kind = event["event"]
+                if kind == "on_chat_model_stream":
+                    if event.get("metadata", {}).get("langgraph_node") != "agent":
+                        continue        # e.g. the conversation summary
+                    content = event["data"]["chunk"].content
+                    if content:
+                        yield _sse("token", {"content": content})
+
+                elif kind == "on_tool_start":
+                    yield _sse("tool_call", {"name": event["name"],
+                                             "input": _tool_args(event["name"], event["data"].get("input"))})
+
+                elif kind == "on_tool_end":
+                    output = event["data"].get("output")
+                    if isinstance(output, Command):
+                        output = output.update["messages"][-1]
+                    yield _sse("tool_result", {"name": event["name"], "output": getattr(output, "content", output)})
+
+        except Exception as e:
+            logger.exception("Error in ask_agent_stream: %s", e)
+            yield _sse("error", {"detail": "LLM service temporarily unavailable. Please try again."})
+            return
+        finally:
+            graph_metrics.finish()
+
+        yield _sse("done", {})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(prune_thread, thread_id)
+    )
+
+
 # @router.get('/book')
 # async def book_interview(request: BookingRequest, db: Session = Depends(get_db)):
 #     pass
@@ -8,21 +8,99 @@ class Settings:
     
     SQLALCHEMY_DB_FILE_URL = os.getenv("DB_URL")
     SQLALCHEMY_DB_BOOKING_INFO_URL = os.getenv("BOOKING_INFO_DB_URL")
+    # Optional async driver URL for the booking DB, e.g. postgresql+asyncpg://... or sqlite+aiosqlite:///...
+    SQLALCHEMY_DB_BOOKING_INFO_ASYNC_URL = os.getenv("BOOKING_INFO_DB_ASYNC_URL")
 
-    REDIS_CACHE_URL = "redis://localhost:6379/0"       # /0 refer to db index: db numbered 0
-    REDIS_MEMORY_URL = "redis://localhost:6379/0"
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))      # seconds before a connection is replaced
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+    REDIS_CACHE_URL = os.getenv("REDIS_CACHE_URL", "redis://localhost:6379/0")       # /0 refer to db index: db numbered 0
+    REDIS_MEMORY_URL = os.getenv("REDIS_MEMORY_URL", "redis://localhost:6379/0")
+    CHECKPOINTER_BACKEND = os.getenv("CHECKPOINTER_BACKEND", "redis")      # redis | memory (single process, not persisted)
+    CHECKPOINT_TTL_MINUTES = int(os.getenv("CHECKPOINT_TTL_MINUTES", 7 * 24 * 60))     # idle threads expire; 0 keeps them
+    CHECKPOINT_KEEP_PER_THREAD = int(os.getenv("CHECKPOINT_KEEP_PER_THREAD", 4))       # older checkpoints are pruned; 0 keeps all
+    CHECKPOINT_COMPRESSION = os.getenv("CHECKPOINT_COMPRESSION", "false").lower() == "true"    # msgpack + zstd
+    CHECKPOINT_COMPRESSION_LEVEL = int(os.getenv("CHECKPOINT_COMPRESSION_LEVEL", 3))
 
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
     MAILTRAP_API_KEY = os.getenv("MAILTRAP_API_KEY")
 
     LLM_MODEL = "mistral-saba-24b"
+    TOKENIZER_MODEL = os.getenv("TOKENIZER_MODEL", "sentence-transformers/all-MiniLM-L6-v2")     # fast tokenizer used to estimate prompt tokens
+    MAX_HISTORY_TOKENS = int(os.getenv("MAX_HISTORY_TOKENS", 3000))
+    SUMMARY_ENABLED = os.getenv("SUMMARY_ENABLED", "true").lower() == "true"
+    SUMMARY_TRIGGER_TOKENS = int(os.getenv("SUMMARY_TRIGGER_TOKENS", 2000))     # stored history size that triggers a summary
+    SUMMARY_KEEP_TOKENS = int(os.getenv("SUMMARY_KEEP_TOKENS", 600))           # newest turns kept verbatim
+    SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", 300))
+    SUMMARY_TOOL_RESULT_CHARS = int(os.getenv("SUMMARY_TOOL_RESULT_CHARS", 500))   # of each tool result shown to the summarizer
+    AGENT_MAX_TOOL_ROUNDS = int(os.getenv("AGENT_MAX_TOOL_ROUNDS", 4))      # tool steps per question before the agent must answer
     EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_DIM = 384
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+    EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", 0))        # 0 disables the process pool
+    EMBEDDING_RUNTIME = os.getenv("EMBEDDING_RUNTIME", "torch")     # torch | onnx | int8
+    EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "")       # e.g. onnx/model_qint8_avx2.onnx
+
+    QUERY_EMBED_CACHE_SIZE = int(os.getenv("QUERY_EMBED_CACHE_SIZE", 2048))
+    QUERY_EMBED_CACHE_TTL = int(os.getenv("QUERY_EMBED_CACHE_TTL", 3600))
+    QUERY_EMBED_CACHE_REDIS = os.getenv("QUERY_EMBED_CACHE_REDIS", "false").lower() == "true"   # share across workers
+
+    RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", 1024))
+    RETRIEVAL_CACHE_TTL = int(os.getenv("RETRIEVAL_CACHE_TTL", 3600))
+
+    STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "off")      # off | background | blocking
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")        # trace spans are INFO records of the app.trace logger
+
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    SEMANTIC_CACHE_DISTANCE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_DISTANCE_THRESHOLD", 0.15))
+    SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", 7200))
 
-    CHUNKING_METHOD = "recursive"
+    CHUNKING_METHOD = os.getenv("CHUNKING_METHOD", "recursive")     # recursive | token | sentence | semantic | fast
+    FAST_CHUNKING_MIN_BYTES = int(os.getenv("FAST_CHUNKING_MIN_BYTES", 5 * 2**20))    # .txt uploads this large use "fast"
+
+    PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", 0))           # 0/1 parses pages in-process
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 50))
+    PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", 16))
+
+    VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "pinecone")     # pinecone | local | memory
+    PINECONE_INDEX_NAME = "file-embeddings-dense"
+    LOCAL_VECTOR_STORE_PATH = os.getenv("LOCAL_VECTOR_STORE_PATH", "data/vector_store")
+    LOCAL_VECTOR_INDEX = os.getenv("LOCAL_VECTOR_INDEX", "flat")     # flat | ivf | hnsw (ivf/hnsw need faiss)
+    HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+    BM25_INDEX_PATH = os.getenv("BM25_INDEX_PATH", "data/bm25_index.npz")
+    HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", 10))     # dense and sparse hits fused per query
+    RRF_K = int(os.getenv("RRF_K", 60))
+    RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", 20))      # top-N fetched before reranking to top_k
+    RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", 16))
+    RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", 150))     # over budget: keep the retrieval order
+    RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", 4096))
+    RERANK_CACHE_TTL = int(os.getenv("RERANK_CACHE_TTL", 3600))
+    UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", 100))
+    INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 4))        # embedded batches waiting for upsert
+    INGEST_MAX_WORKERS = int(os.getenv("INGEST_MAX_WORKERS", 2))      # uploads processed concurrently
+    INGEST_MAX_PENDING = int(os.getenv("INGEST_MAX_PENDING", 16))     # queued + running uploads before rejecting
 
     SENDER_EMAIL = os.getenv("SENDER_EMAIL")
     SENDER_MAIL_PASSWORD = os.getenv("SENDER_EMAIL_PASSWORD")
+
+    SMTP_HOST = os.getenv("SMTP_HOST", "live.smtp.mailtrap.io")
+    SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+    SMTP_LOGIN = os.getenv("SMTP_LOGIN", "api")
+    SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", MAILTRAP_API_KEY)
+    SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+    SMTP_SENDER = os.getenv("SMTP_SENDER", "hello@demomailtrap.co")
+
+    OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", 2))
+    OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 20))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 5))
+    OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", 5))      # seconds, doubled per attempt
+    OUTBOX_CLAIM_TIMEOUT = int(os.getenv("OUTBOX_CLAIM_TIMEOUT", 300))    # reclaim rows stuck in 'sending'
     
 
 
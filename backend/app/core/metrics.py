@@ -0,0 +1,85 @@
+import os
+from typing import Callable, Dict, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "rag_http_request_seconds", "HTTP request latency", ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+NODE_SECONDS = Histogram(
+    "rag_graph_node_seconds", "Agent graph node latency", ["node"], buckets=LATENCY_BUCKETS
+)
+TOOL_SECONDS = Histogram(
+    "rag_tool_seconds", "Tool call latency", ["tool", "status"], buckets=LATENCY_BUCKETS
+)
+LLM_SECONDS = Histogram(
+    "rag_llm_request_seconds", "LLM call latency", ["model"], buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "rag_llm_tokens", "LLM tokens used", ["model", "kind"]       # kind: prompt | completion
+)
+STAGE_SECONDS = Histogram(
+    "rag_stage_seconds", "Latency of traced stages (embedding, vector query, checkpointing, ...)", ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+AGENT_ITERATIONS = Histogram(
+    "rag_agent_loop_iterations", "Agent node runs per request (agent <-> tools loop)",
+    buckets=(1, 2, 3, 4, 5, 6, 8, 10, 15, 25)
+)
+TOOL_CALLS_DEDUPLICATED = Counter(
+    "rag_tool_calls_deduplicated", "Tool calls answered from an identical earlier call of the same question", ["tool"]
+)
+INGESTED_CHUNKS = Counter(
+    "rag_ingested_chunks", "Chunks processed by ingestion", ["result"]      # embedded | skipped | removed
+)
+INGESTION_SECONDS = Histogram(
+    "rag_ingestion_job_seconds", "Ingestion job duration", ["status"],
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+)
+
+
+class CacheStatsCollector:
+    """Exposes the in-process caches' stats() (hits, misses, hit_rate) at scrape time"""
+
+    def __init__(self):
+        self._sources: Dict[str, Callable[[], Optional[dict]]] = {}
+
+    def register(self, name: str, stats: Callable[[], Optional[dict]]):
+        self._sources[name] = stats
+
+    def collect(self):
+        hits = CounterMetricFamily("rag_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("rag_cache_misses", "Cache misses", labels=["cache"])
+        hit_rate = GaugeMetricFamily("rag_cache_hit_rate", "Cache hit rate since start", labels=["cache"])
+        for name, source in self._sources.items():
+            stats = source()
+            if not stats:
+                continue
+            hits.add_metric([name], stats.get("hits", 0))
+            misses.add_metric([name], stats.get("misses", 0))
+            hit_rate.add_metric([name], stats.get("hit_rate", 0.0))
+        yield hits
+        yield misses
+        yield hit_rate
+
+
+cache_stats = CacheStatsCollector()
+REGISTRY.register(cache_stats)
+
+
+def metrics_payload() -> tuple:
+    """Body and content type for /metrics; aggregates all workers under PROMETHEUS_MULTIPROC_DIR"""
+
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(cache_stats)      # per-worker caches; only this worker's stats
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,109 @@
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from .metrics import HTTP_REQUEST_SECONDS, STAGE_SECONDS
+
+
+logger = logging.getLogger("app.trace")
+
+_trace_id: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+_span_id: ContextVar[Optional[str]] = ContextVar("span_id", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def emit(record: dict):
+    """Write one structured trace record as a JSON log line"""
+
+    logger.info(json.dumps(record, default=str))
+
+
+def event(name: str, **attrs):
+    """A point-in-time record attached to the current span"""
+
+    emit({"type": "event", "name": name, "trace_id": _trace_id.get(), "span_id": _span_id.get(), **attrs})
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a block as a child of the current span and record it in rag_stage_seconds.
+
+    Context variables follow asyncio tasks and asyncio.to_thread, so spans opened
+    in tools and worker threads nest under the request that caused them. Yields
+    a dict; keys added to it are logged with the span.
+    """
+
+    trace_id = _trace_id.get()
+    root = trace_id is None
+    if root:
+        trace_id = _new_id()
+    span_id, parent_id = _new_id(), _span_id.get()
+    trace_token = _trace_id.set(trace_id) if root else None
+    span_token = _span_id.set(span_id)
+
+    status = "ok"
+    start = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException as e:
+        status = "error"
+        attrs["error"] = repr(e)
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        _span_id.reset(span_token)
+        if trace_token is not None:
+            _trace_id.reset(trace_token)
+        STAGE_SECONDS.labels(name).observe(duration)
+        emit({"type": "span", "name": name, "trace_id": trace_id, "span_id": span_id, "parent_id": parent_id,
+              "duration_ms": round(duration * 1000, 3), "status": status, **attrs})
+
+
+class TraceMiddleware:
+    """ASGI middleware opening the root span of every HTTP request.
+
+    The trace id comes from an incoming X-Request-ID header or is generated, and
+    is returned as X-Trace-ID. Being plain ASGI, the span also covers streamed
+    response bodies.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        trace_id = headers.get(b"x-request-id", b"").decode() or _new_id()
+        token = _trace_id.set(trace_id)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-trace-id", trace_id.encode())]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            with span("http.request", method=scope["method"], path=scope["path"]) as attrs:
+                await self.app(scope, receive, send_wrapper)
+                attrs["status_code"] = status["code"]
+        finally:
+            _trace_id.reset(token)
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status["code"])
+            ).observe(time.perf_counter() - start)
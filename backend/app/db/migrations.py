@@ -0,0 +1,99 @@
+"""Schema and index upgrades for deployments created by earlier versions.
+
+    add_missing_columns   run at startup: create_all creates missing tables but never
+                          alters existing ones, e.g. file_metadata.content_hash
+    purge_legacy_vectors  one-off: vectors ingested before chunk tracking have random
+                          ids and no file_chunk rows, so re-uploads cannot replace them
+
+Run the purge from the backend directory, then re-upload the files it lists:
+    python -m app.db.migrations --purge-legacy-vectors
+"""
+import argparse
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from .session import Base
+
+
+logger = logging.getLogger(__name__)
+
+DELETE_BATCH_SIZE = 1000        # Pinecone's limit per delete call
+
+
+def add_missing_columns(engine: Engine):
+    """Add nullable columns the models define but existing tables lack, with their indexes"""
+
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                logger.error("Cannot add NOT NULL column %s.%s to an existing table; migrate it by hand",
+                             table.name, column.name)
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                for index in table.indexes:
+                    if column in index.columns:
+                        index.create(conn, checkfirst=True)
+            logger.info("Added column %s.%s", table.name, column.name)
+
+
+def purge_legacy_vectors() -> list:
+    """Delete vectors without a chunk-tracked id from the vector store and BM25 index.
+
+    Returns the filenames whose chunks were never tracked; they are not searchable
+    until uploaded again.
+    """
+
+    from ..core.config import settings
+    from ..ingestion.pipeline import CHUNK_ID_PATTERN, batched
+    from ..vectorstore.cache import corpus_version
+    from ..vectorstore.factory import get_sparse_index, get_vector_store
+    from .models import file_db
+    from .session import SessionLocal_file
+
+    store = get_vector_store()
+    legacy = [vec_id for vec_id in store.list_ids() if not CHUNK_ID_PATTERN.match(vec_id)]
+    for batch in batched(legacy, DELETE_BATCH_SIZE):
+        store.delete(batch)
+    if settings.HYBRID_SEARCH_ENABLED:
+        sparse = get_sparse_index()
+        sparse.delete(legacy)
+        sparse.save()
+    corpus_version.bump()
+    logger.info("Deleted %d legacy vectors", len(legacy))
+
+    with SessionLocal_file() as db:
+        tracked = db.query(file_db.FileChunk.file_id).distinct()
+        untracked = db.query(file_db.FileMetadata).filter(file_db.FileMetadata.id.notin_(tracked)).all()
+        return [entry.filename for entry in untracked]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--purge-legacy-vectors", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from .models import booking_db, file_db     # registers the tables on Base.metadata
+    from .session import engine_booking, engine_file
+
+    for engine in (engine_file, engine_booking):
+        Base.metadata.create_all(bind=engine)
+        add_missing_columns(engine)
+
+    if args.purge_legacy_vectors:
+        for filename in purge_legacy_vectors():
+            print(f"re-upload: {filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, ForeignKey
 from ..session import Base
 
 
@@ -9,3 +9,14 @@ class FileMetadata(Base):
     filename = Column(String)
     chunking_method = Column(String)
     embedding_model = Column(String)
+    content_hash = Column(String, index=True)       # sha256 of the uploaded bytes; NULL until ingestion completes
+
+
+class FileChunk(Base):
+    """One row per chunk currently indexed for a file; chunk_id is the vector id"""
+    __tablename__ = "file_chunk"
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_id = Column(Integer, ForeignKey("file_metadata.id"), index=True, nullable=False)
+    chunk_id = Column(String, nullable=False, unique=True)
+    chunk_hash = Column(String, nullable=False)
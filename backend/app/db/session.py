@@ -1,19 +1,54 @@
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from ..core.config import settings
 from sqlalchemy.orm import sessionmaker
 
 
-engine_file = create_engine(settings.SQLALCHEMY_DB_FILE_URL)
+def engine_kwargs(url: str) -> dict:
+    """Pool settings for create_engine / create_async_engine"""
+
+    kwargs = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if url.startswith("sqlite"):
+        # Sessions are handed across threads by the tool executor
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if ":memory:" in url or url.rstrip("/").endswith(":"):
+            return kwargs       # in-memory SQLite uses a single shared connection, no QueuePool
+    kwargs.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return kwargs
+
+
+engine_file = create_engine(settings.SQLALCHEMY_DB_FILE_URL, **engine_kwargs(settings.SQLALCHEMY_DB_FILE_URL))
 
 Base = declarative_base()       # Mapper
 
 SessionLocal_file = sessionmaker(bind=engine_file, autoflush=False, autocommit=False)
 
-engine_booking = create_engine(settings.SQLALCHEMY_DB_BOOKING_INFO_URL)
+engine_booking = create_engine(settings.SQLALCHEMY_DB_BOOKING_INFO_URL, **engine_kwargs(settings.SQLALCHEMY_DB_BOOKING_INFO_URL))
 
 SessionLocal_booking = sessionmaker(bind=engine_booking, autoflush=False, autocommit=False)
 
+# Async booking engine, only when an async driver URL is configured
+async_engine_booking = (
+    create_async_engine(
+        settings.SQLALCHEMY_DB_BOOKING_INFO_ASYNC_URL,
+        **engine_kwargs(settings.SQLALCHEMY_DB_BOOKING_INFO_ASYNC_URL)
+    )
+    if settings.SQLALCHEMY_DB_BOOKING_INFO_ASYNC_URL else None
+)
+
+AsyncSessionLocal_booking = (
+    async_sessionmaker(bind=async_engine_booking, autoflush=False, expire_on_commit=False)
+    if async_engine_booking else None
+)
+
 
 def get_db():
     db = SessionLocal_file()
@@ -28,4 +63,4 @@ def get_booking_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,74 @@
+import hashlib
+import logging
+import re
+from typing import List, Optional
+
+import numpy as np
+from redis import Redis
+
+from ..utils.lru import LRUTTLCache
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(text: str) -> str:
+    """Collapse whitespace and case; all-MiniLM-L6-v2 uses an uncased tokenizer so this keeps vectors identical"""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU + TTL cache of query embeddings with an optional shared Redis tier"""
+
+    def __init__(self, model_name: str, maxsize: int = 2048, ttl: int = 3600,
+                 redis_url: Optional[str] = None):
+        self.model_name = model_name
+        self.ttl = ttl
+        self._local = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+        self._redis = Redis.from_url(redis_url) if redis_url else None
+        self.redis_hits = 0
+
+    def _key(self, text: str) -> str:
+        return f"{self.model_name}:{normalize_query(text)}"
+
+    def _redis_key(self, key: str) -> str:
+        return "qemb:" + hashlib.sha1(key.encode()).hexdigest()
+
+    def get(self, text: str) -> Optional[List[float]]:
+        key = self._key(text)
+        vector = self._local.get(key)
+        if vector is not None or self._redis is None:
+            return vector
+
+        try:
+            raw = self._redis.get(self._redis_key(key))
+        except Exception as e:
+            logger.warning("Query embedding cache: Redis unavailable: %s", e)
+            return None
+        if raw is None:
+            return None
+
+        vector = np.frombuffer(raw, dtype=np.float32).tolist()
+        self._local.set(key, vector)
+        self.redis_hits += 1
+        return vector
+
+    def set(self, text: str, vector: List[float]):
+        key = self._key(text)
+        self._local.set(key, vector)
+
+        if self._redis is not None:
+            try:
+                self._redis.set(self._redis_key(key), np.asarray(vector, dtype=np.float32).tobytes(), ex=self.ttl)
+            except Exception as e:
+                logger.warning("Query embedding cache: Redis unavailable: %s", e)
+
+    def stats(self) -> dict:
+        stats = self._local.stats()
+        # A Redis hit first counted as a local miss
+        stats["hits"] += self.redis_hits
+        stats["misses"] -= self.redis_hits
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["redis_hits"] = self.redis_hits
+        return stats
@@ -1,40 +1,106 @@
-from langchain_huggingface import HuggingFaceEmbeddings
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Optional, Sequence
+
+import numpy as np
 from ..core.config import settings
+from .cache import QueryEmbeddingCache
+from ..core.metrics import cache_stats
+from .runtime import load_embeddings
+from ..utils.lazy import locked_cache
 from uuid import uuid4
 
 
 model_name = settings.EMBEDDING_MODEL
-model_kwargs = {'device': 'cpu'}
-encode_kwargs = {'normalize_embeddings': False}
-hf = HuggingFaceEmbeddings(
-    model_name=model_name,
-    model_kwargs=model_kwargs,
-    encode_kwargs=encode_kwargs
+
+query_cache = QueryEmbeddingCache(
+    # Runtimes differ slightly in their vectors, so only torch shares the plain model key
+    model_name=model_name if settings.EMBEDDING_RUNTIME == "torch" else f"{model_name}:{settings.EMBEDDING_RUNTIME}",
+    maxsize=settings.QUERY_EMBED_CACHE_SIZE,
+    ttl=settings.QUERY_EMBED_CACHE_TTL,
+    redis_url=settings.REDIS_CACHE_URL if settings.QUERY_EMBED_CACHE_REDIS else None
 )
+cache_stats.register("query_embedding", query_cache.stats)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+@locked_cache
+def get_embeddings():
+    """The embedding model, loaded on first use in each process that embeds"""
+
+    return load_embeddings(settings.EMBEDDING_RUNTIME, model_name)
+
+
+def embed_query(text: str) -> List[float]:
+    """Embed a search query, reusing cached vectors for repeated queries"""
+
+    vector = query_cache.get(text)
+    if vector is None:
+        vector = get_embeddings().embed_query(text)
+        query_cache.set(text, vector)
+    return vector
+
+
+def _embed_batch(texts: List[str]) -> np.ndarray:
+    """Embed one batch of texts with the module level model"""
+
+    return np.asarray(get_embeddings().embed_documents(texts), dtype=np.float32)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Lazily create the process pool used for multi-core embedding"""
+
+    global _pool
+    if _pool is None:
+        # 'spawn' so that workers load their own model instead of forking torch threads
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+    return _pool
 
 
-def create_embeddings(docs):
+def embed_texts(
+    texts: Sequence[str],
+    batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+    workers: int = settings.EMBEDDING_WORKERS,
+) -> np.ndarray:
+    """Embed texts in batches into a contiguous (n, dim) float32 matrix"""
+
+    batches = [list(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+    if not batches:
+        return np.empty((0, 0), dtype=np.float32)
+
+    if workers > 1 and len(batches) > 1:
+        results = _get_pool(workers).map(_embed_batch, batches)
+    else:
+        results = map(_embed_batch, batches)
+
+    matrix = None
+    offset = 0
+    for batch_embeds in results:
+        if matrix is None:
+            matrix = np.empty((len(texts), batch_embeds.shape[1]), dtype=np.float32)
+        matrix[offset:offset + len(batch_embeds)] = batch_embeds
+        offset += len(batch_embeds)
+
+    return matrix
+
+
+def create_embeddings(docs, batch_size: int = settings.EMBEDDING_BATCH_SIZE):
     """Create embeddings of the specified texts"""
 
+    embeddings = embed_texts([doc.page_content for doc in docs], batch_size=batch_size)
+
     vectors = []
-    for doc in docs:
-        text = doc.page_content
+    for doc, embedding in zip(docs, embeddings):
         metadata = dict(doc.metadata)
-        metadata["text"] = text
+        metadata["text"] = doc.page_content
         doc_id = doc.id or str(uuid4())      # Generate random id if id in docs is null
 
-        embedding = hf.embed_query(text)
-
         vectors.append({
             "id": doc_id,
-            "values": embedding,
+            "values": embedding.tolist(),
             "metadata": metadata,
             }
         )
-    
-    return vectors
-
-
-
-
 
+    return vectors
@@ -0,0 +1,116 @@
+import hashlib
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from ..core.config import settings
+from ..utils.lru import LRUTTLCache
+from ..core.metrics import cache_stats
+from .cache import normalize_query
+
+
+class CrossEncoderReranker:
+    """Rerank retrieval candidates with a small CPU cross-encoder under a latency budget.
+
+    Candidates are scored in batches. Before each batch, the time spent so far plus
+    the running per-batch estimate is checked against `budget_ms`; if it would
+    overrun, the call gives up and returns the candidates in their original (dense
+    or fused) order. A batch that was started is paid for, so if it overruns, its
+    scores are still used. Scores are cached per (query, chunk text), so the batches that
+    did finish still speed up the next identical search.
+    """
+
+    def __init__(self, model_name: str = settings.RERANK_MODEL,
+                 batch_size: int = settings.RERANK_BATCH_SIZE,
+                 budget_ms: float = settings.RERANK_BUDGET_MS,
+                 cache_size: int = settings.RERANK_CACHE_SIZE,
+                 cache_ttl: int = settings.RERANK_CACHE_TTL):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.budget_ms = budget_ms
+        self._scores = LRUTTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._batch_ms: Optional[float] = None        # moving average of one batch
+        self._stats_lock = threading.Lock()
+        self.calls = 0
+        self.fallbacks = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+
+    def _get_model(self):
+        """Load the cross-encoder on first use; loading is not charged to the budget"""
+
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+                    self._model = CrossEncoder(self.model_name, device="cpu")
+        return self._model
+
+    def _key(self, query: str, text: str) -> str:
+        return hashlib.sha1(f"{self.model_name}\0{normalize_query(query)}\0{text}".encode()).hexdigest()
+
+    def rerank(self, query: str, texts: Sequence[str], top_k: int) -> Tuple[List[int], dict]:
+        """Return the indices of the top_k texts and a report of what the rerank cost"""
+
+        model = self._get_model()
+        start = time.perf_counter()
+        keys = [self._key(query, text) for text in texts]
+        scores = [self._scores.get(key) for key in keys]
+        todo = [i for i, score in enumerate(scores) if score is None]
+        cached = len(texts) - len(todo)
+
+        fallback = None
+        for batch_start in range(0, len(todo), self.batch_size):
+            elapsed = (time.perf_counter() - start) * 1000
+            if self._batch_ms is not None and elapsed + self._batch_ms > self.budget_ms:
+                fallback = "budget"
+                break
+
+            batch = todo[batch_start:batch_start + self.batch_size]
+            batch_begin = time.perf_counter()
+            batch_scores = model.predict([(query, texts[i]) for i in batch], batch_size=self.batch_size)
+            batch_ms = (time.perf_counter() - batch_begin) * 1000
+            self._batch_ms = batch_ms if self._batch_ms is None else 0.8 * self._batch_ms + 0.2 * batch_ms
+
+            for i, score in zip(batch, batch_scores):
+                scores[i] = float(score)
+                self._scores.set(keys[i], scores[i])
+
+        if fallback:
+            order = list(range(min(top_k, len(texts))))
+        else:
+            order = sorted(range(len(texts)), key=lambda i: scores[i], reverse=True)[:top_k]
+
+        added_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            self.calls += 1
+            self.fallbacks += fallback is not None
+            self.total_ms += added_ms
+            self.last_ms = added_ms
+
+        return order, {
+            "candidates": len(texts),
+            "cached": cached,
+            "scored": sum(score is not None for score in scores) - cached,
+            "added_ms": round(added_ms, 2),
+            "over_budget": added_ms > self.budget_ms,       # a last batch that overran still has its scores used
+            "fallback": fallback,
+        }
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "calls": self.calls,
+                "fallbacks": self.fallbacks,
+                "avg_added_ms": self.total_ms / self.calls if self.calls else 0.0,
+                "last_added_ms": self.last_ms,
+                "budget_ms": self.budget_ms,
+                "score_cache": self._scores.stats(),
+            }
+
+
+reranker = CrossEncoderReranker() if settings.RERANK_ENABLED else None
+if reranker is not None:
+    cache_stats.register("rerank_score", lambda: reranker.stats()["score_cache"])
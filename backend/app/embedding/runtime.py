@@ -0,0 +1,56 @@
+import importlib.util
+import logging
+from typing import TYPE_CHECKING
+
+from ..core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+
+RUNTIMES = ("torch", "onnx", "int8")
+ONNX_DEPENDENCIES = ("onnxruntime", "optimum")       # sentence-transformers' onnx backend needs both
+
+
+def load_embeddings(runtime: str = settings.EMBEDDING_RUNTIME,
+                    model_name: str = settings.EMBEDDING_MODEL,
+                    batch_size: int = settings.EMBEDDING_BATCH_SIZE) -> "HuggingFaceEmbeddings":
+    """Load the sentence-transformers embedding model on CPU with the selected runtime.
+
+    torch  full precision PyTorch (the reference vectors)
+    onnx   ONNX Runtime via sentence-transformers' onnx backend; EMBEDDING_ONNX_FILE
+           picks a file from the model repo, e.g. "onnx/model_qint8_avx2.onnx" for
+           the pre-quantized export. Needs `optimum[onnxruntime]`.
+    int8   PyTorch with dynamic int8 quantization of every nn.Linear layer
+    """
+
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    if runtime not in RUNTIMES:
+        raise ValueError(f"Unknown embedding runtime '{runtime}'. Available: {', '.join(RUNTIMES)}")
+
+    model_kwargs = {"device": "cpu"}
+    if runtime == "onnx":
+        missing = [name for name in ONNX_DEPENDENCIES if importlib.util.find_spec(name) is None]
+        if missing:     # optional dependencies
+            logger.warning("%s not installed; falling back to the torch embedding runtime", ", ".join(missing))
+            runtime = "torch"
+        else:
+            model_kwargs["backend"] = "onnx"
+            if settings.EMBEDDING_ONNX_FILE:
+                model_kwargs["model_kwargs"] = {"file_name": settings.EMBEDDING_ONNX_FILE}
+
+    embeddings = HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs=model_kwargs,
+        encode_kwargs={"normalize_embeddings": False, "batch_size": batch_size}
+    )
+
+    if runtime == "int8":
+        import torch
+        torch.quantization.quantize_dynamic(embeddings._client, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+    return embeddings
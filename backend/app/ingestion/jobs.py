@@ -0,0 +1,140 @@
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, Optional
+from uuid import uuid4
+
+from ..core.config import settings
+from ..core.metrics import INGESTION_SECONDS
+from ..core.tracing import span
+
+
+logger = logging.getLogger(__name__)
+
+JOB_RETENTION_SECONDS = 3600        # finished jobs stay pollable for an hour
+
+
+@dataclass
+class IngestionJob:
+    id: str
+    filename: str
+    status: str = "queued"          # queued -> running -> completed | failed; queued -> cancelled on shutdown
+    chunks_embedded: int = 0
+    chunks_upserted: int = 0
+    chunks_skipped: int = 0         # unchanged since the previous upload
+    file_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def update_progress(self, stats: dict):
+        self.chunks_embedded = stats["chunks"]
+        self.chunks_upserted = stats["upserted"]
+        self.chunks_skipped = stats["skipped"]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class QueueFullError(Exception):
+    """Raised when the ingestion queue has no room for another job"""
+
+
+class DuplicateJobError(Exception):
+    """Raised when a job for the same filename is still queued or running"""
+
+    def __init__(self, job: IngestionJob):
+        super().__init__(f"{job.filename} is already being ingested (job {job.id}).")
+        self.job = job
+
+
+class IngestionJobQueue:
+    """Bounded worker pool that runs ingestion jobs off the event loop"""
+
+    def __init__(self, max_workers: int = settings.INGEST_MAX_WORKERS,
+                 max_pending: int = settings.INGEST_MAX_PENDING):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._jobs: Dict[str, IngestionJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, filename: str, fn: Callable[[IngestionJob], Optional[int]]) -> IngestionJob:
+        """Queue `fn(job)`; its return value is stored as the job's file_id.
+
+        At most one job per filename is queued or running, so concurrent uploads
+        of the same file cannot both create its metadata.
+        """
+
+        job = IngestionJob(id=str(uuid4()), filename=filename)
+        with self._lock:
+            self._prune()
+            active = next((other for other in self._jobs.values()
+                           if other.filename == filename and other.finished_at is None), None)
+            if active is not None:
+                raise DuplicateJobError(active)
+            if not self._slots.acquire(blocking=False):
+                raise QueueFullError("Too many uploads in progress. Please retry later.")
+            self._jobs[job.id] = job
+
+        try:
+            # Run in a copy of the caller's context so the job's spans join the upload request's trace
+            self._executor.submit(contextvars.copy_context().run, self._run, job, fn)
+        except Exception:
+            with self._lock:
+                del self._jobs[job.id]
+            self._slots.release()
+            raise
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _run(self, job: IngestionJob, fn: Callable[[IngestionJob], Optional[int]]):
+        with self._lock:
+            if job.status != "queued":      # cancelled by shutdown
+                self._slots.release()
+                return
+            job.status = "running"
+        start = time.perf_counter()
+        try:
+            with span("ingestion.job", job_id=job.id, filename=job.filename) as attrs:
+                try:
+                    job.file_id = fn(job)
+                    job.status = "completed"
+                except Exception as e:
+                    logger.error("Ingestion job %s failed: %s", job.id, e)
+                    job.error = str(e)
+                    job.status = "failed"
+                elapsed = time.perf_counter() - start
+                attrs.update(status=job.status, chunks_embedded=job.chunks_embedded,
+                             chunks_skipped=job.chunks_skipped,
+                             chunks_per_sec=round(job.chunks_embedded / elapsed, 1) if elapsed else None)
+            INGESTION_SECONDS.labels(job.status).observe(elapsed)
+        finally:
+            job.finished_at = time.time()
+            self._slots.release()
+
+    def shutdown(self):
+        """Cancel the jobs that have not started; running jobs are left to finish"""
+
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == "queued":
+                    job.status = "cancelled"
+                    job.error = "Server shut down before the job started"
+                    job.finished_at = time.time()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+job_queue = IngestionJobQueue()
@@ -0,0 +1,141 @@
+import hashlib
+import queue
+import re
+import threading
+from collections import Counter
+from itertools import islice
+from typing import Callable, Collection, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from ..core.config import settings
+from ..embedding.embedder import create_embeddings
+from ..utils.file_utils import iter_chunks
+
+
+_DONE = object()
+
+# Ids given by iter_hashed_chunks; vectors ingested before chunk tracking have random uuids
+CHUNK_ID_PATTERN = re.compile(r"^\d+-[0-9a-f]{32}-\d+$")
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """Yield lists of at most `size` items"""
+
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def content_hash(data) -> str:
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+def iter_hashed_chunks(docs: Iterable[Document], method: str, file_key: str) -> Iterator[Document]:
+    """Chunk documents and give each chunk a deterministic id derived from its content.
+
+    The id is file_key + chunk hash + occurrence number, so an unchanged chunk keeps
+    its id across re-uploads of the same file and identical chunks stay distinct.
+    """
+
+    seen = Counter()
+    for chunk in iter_chunks(docs, method):
+        chunk_hash = content_hash(chunk.page_content)
+        seen[chunk_hash] += 1
+        chunk.id = f"{file_key}-{chunk_hash[:32]}-{seen[chunk_hash]}"
+        chunk.metadata["file_id"] = file_key
+        chunk.metadata["chunk_hash"] = chunk_hash
+        yield chunk
+
+
+def iter_vector_batches(
+    chunks: Iterable[Document],
+    batch_size: int = settings.UPSERT_BATCH_SIZE,
+) -> Iterator[List[dict]]:
+    """embed chunks, yielding bounded batches of upsert-ready vectors"""
+
+    for batch in batched(chunks, batch_size):
+        yield create_embeddings(batch)
+
+
+def ingest_documents(
+    docs: Iterable[Document],
+    index,
+    method: str = settings.CHUNKING_METHOD,
+    batch_size: int = settings.UPSERT_BATCH_SIZE,
+    queue_size: int = settings.INGEST_QUEUE_SIZE,
+    on_progress: Optional[Callable[[dict], None]] = None,
+    file_key: Optional[str] = None,
+    existing_ids: Collection[str] = (),
+    sparse_index=None,
+) -> dict:
+    """Embed documents and upsert them into `index`, overlapping embedding with network I/O.
+
+    The calling thread embeds batches while a consumer thread upserts them. The
+    bounded queue applies backpressure, so at most `queue_size` embedded batches
+    are held in memory regardless of the document size. `on_progress` receives
+    the running {"chunks", "upserted", "skipped"} counts after every batch.
+
+    With a `file_key`, chunks get content-derived ids and those already in
+    `existing_ids` are skipped; the returned "chunk_ids" lists (id, hash) for
+    every chunk of the document so callers can diff against the previous version.
+
+    A `sparse_index` (BM25Index) is fed the same chunk texts as they are upserted;
+    skipped chunks it does not hold yet are added too, which backfills files
+    ingested before hybrid search was enabled.
+    """
+
+    pending: queue.Queue = queue.Queue(maxsize=queue_size)
+    stats = {"chunks": 0, "upserted": 0, "skipped": 0}
+    chunk_ids: List[Tuple[str, str]] = []
+    errors: List[BaseException] = []
+
+    def consume():
+        while True:
+            batch = pending.get()
+            if batch is _DONE:
+                return
+            if errors:
+                continue        # drain the queue so the producer never blocks
+            try:
+                index.upsert(vectors=batch)
+                if sparse_index is not None:
+                    sparse_index.add((v["id"], v["metadata"]["text"]) for v in batch)
+                stats["upserted"] += len(batch)
+                if on_progress:
+                    on_progress(dict(stats))
+            except BaseException as e:
+                errors.append(e)
+
+    def changed_chunks():
+        chunks = iter_chunks(docs, method) if file_key is None else iter_hashed_chunks(docs, method, file_key)
+        for chunk in chunks:
+            if file_key is not None:
+                chunk_ids.append((chunk.id, chunk.metadata["chunk_hash"]))
+                if chunk.id in existing_ids:
+                    stats["skipped"] += 1
+                    if sparse_index is not None and chunk.id not in sparse_index:
+                        sparse_index.add([(chunk.id, chunk.page_content)])
+                    continue
+            yield chunk
+
+    consumer = threading.Thread(target=consume, name="vector-upsert", daemon=True)
+    consumer.start()
+    try:
+        for batch in iter_vector_batches(changed_chunks(), batch_size):
+            if errors:
+                break
+            stats["chunks"] += len(batch)
+            if on_progress:
+                on_progress(dict(stats))
+            pending.put(batch)
+    finally:
+        pending.put(_DONE)
+        consumer.join()
+
+    if errors:
+        raise errors[0]
+
+    return {**stats, "chunk_ids": chunk_ids}
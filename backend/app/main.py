@@ -1,11 +1,119 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from .api import file_upload, rag_agent
-from .db.session import Base, engine_file, engine_booking
+from .core.config import settings
+from .core.metrics import metrics_payload
+from .core.tracing import TraceMiddleware
+from .db.session import Base, engine_file, engine_booking, SessionLocal_booking, async_engine_booking
+from .db.migrations import add_missing_columns
+from .utils.outbox import OutboxWorker
+from .ingestion.jobs import job_queue
+from .agent.memory import ensure_checkpointer, checkpointer_ready
+from .agent.rag_graph import get_rag_app
+from .embedding.embedder import embed_query, get_embeddings
+from .embedding.reranker import reranker
+from .vectorstore.factory import get_vector_store
+from .utils.tokenizer import get_tokenizer
+
+
+logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+logger = logging.getLogger(__name__)
+
+
+outbox_worker = OutboxWorker(SessionLocal_booking)
+
+
+def create_tables():
+    for engine in (engine_file, engine_booking):
+        try:
+            Base.metadata.create_all(bind=engine)
+            add_missing_columns(engine)
+        except Exception as e:
+            logger.error("Could not create tables on %s: %s", engine.url.render_as_string(hide_password=True), e)
+
+
+def warm_up():
+    """Build the lazy resources ahead of the first request; a failing dependency is logged, not fatal"""
+
+    steps = [
+        ("embedding model", lambda: embed_query("warm up")),
+        ("vector store", get_vector_store),
+        ("history tokenizer", lambda: get_tokenizer(settings.TOKENIZER_MODEL)),
+        ("agent graph", get_rag_app),
+    ]
+    if reranker is not None:
+        steps.append(("reranker", lambda: reranker.rerank("warm up", ["warm up"], 1)))
+
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            step()
+            logger.info("Warm-up: %s ready in %.2fs", name, time.perf_counter() - start)
+        except Exception as e:
+            logger.error("Warm-up: %s failed: %s", name, e)
+
 
-app = FastAPI()
+async def async_warm_up():
+    # The Redis saver binds to the running event loop, so it is built here before the graph
+    try:
+        await ensure_checkpointer()
+    except Exception as e:
+        logger.error("Warm-up: checkpointer failed: %s", e)
+    await asyncio.to_thread(warm_up)
 
-Base.metadata.create_all(bind=engine_file)
-Base.metadata.create_all(bind=engine_booking)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Heavy resources (embedding model, vector store, Redis checkpointer, graph) are built
+    # on first use; STARTUP_WARMUP builds them now, before or alongside serving traffic
+    await asyncio.to_thread(create_tables)
+    outbox_worker.start()
+
+    warm_up_task = None
+    if settings.STARTUP_WARMUP == "blocking":
+        await async_warm_up()
+    elif settings.STARTUP_WARMUP == "background":
+        warm_up_task = asyncio.create_task(async_warm_up())
+
+    yield
+
+    if warm_up_task is not None and not warm_up_task.done():
+        warm_up_task.cancel()
+    job_queue.shutdown()
+    outbox_worker.stop()
+    if async_engine_booking is not None:
+        await async_engine_booking.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(TraceMiddleware)
 
 app.include_router(file_upload.router, prefix='/upload', tags=["Upload"])
-app.include_router(rag_agent.router, prefix='/agent', tags=["Agent"])
\ No newline at end of file
+app.include_router(rag_agent.router, prefix='/agent', tags=["Agent"])
+
+
+@app.get('/health')
+async def health():
+    """Liveness, plus which lazily built resources are loaded in this worker"""
+
+    return {
+        "status": "ok",
+        "loaded": {
+            "embedding_model": get_embeddings.loaded(),
+            "vector_store": get_vector_store.loaded(),
+            "agent_graph": get_rag_app.loaded(),
+            "checkpointer": checkpointer_ready(),
+        }
+    }
+
+
+@app.get('/metrics', include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+
+    body, content_type = metrics_payload()
+    return Response(content=body, media_type=content_type)
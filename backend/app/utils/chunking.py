@@ -0,0 +1,166 @@
+import re
+from typing import Callable, Dict, Iterable, Iterator, List
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from ..core.config import settings
+from .tokenizer import get_tokenizer
+
+
+Chunker = Callable[[Iterable[Document]], Iterator[Document]]
+
+CHUNKERS: Dict[str, Chunker] = {}
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+
+
+def register_chunker(name: str):
+    """Register a streaming chunker under `name` (the value of CHUNKING_METHOD)"""
+
+    def decorator(fn: Chunker) -> Chunker:
+        CHUNKERS[name] = fn
+        return fn
+    return decorator
+
+
+def get_chunker(method: str) -> Chunker:
+    try:
+        return CHUNKERS[method]
+    except KeyError:
+        raise ValueError(f"Unknown chunking method '{method}'. Available: {', '.join(sorted(CHUNKERS))}")
+
+
+def _chunk(doc: Document, text: str) -> Document:
+    return Document(page_content=text, metadata=dict(doc.metadata))
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_END.split(text) if s and s.strip()]
+
+
+@register_chunker("recursive")
+def recursive_chunks(docs: Iterable[Document], chunk_size: int = 1000, chunk_overlap: int = 200) -> Iterator[Document]:
+    """Character windows split on paragraph/line/word boundaries"""
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+
+    for doc in docs:
+        yield from text_splitter.split_documents([doc])
+
+
+@register_chunker("token")
+def token_chunks(docs: Iterable[Document], chunk_tokens: int = 254, overlap_tokens: int = 32) -> Iterator[Document]:
+    """Windows of the embedding model's tokens, so no chunk is truncated by the embedder.
+
+    MiniLM's max_seq_length of 256 includes [CLS] and [SEP], leaving 254 word pieces.
+    """
+
+    tokenizer = get_tokenizer(settings.EMBEDDING_MODEL)
+    if tokenizer is None:
+        # Roughly 4 characters per token without the tokenizer
+        yield from recursive_chunks(docs, chunk_size=chunk_tokens * 4, chunk_overlap=overlap_tokens * 4)
+        return
+
+    step = chunk_tokens - overlap_tokens
+    for doc in docs:
+        offsets = tokenizer.encode(doc.page_content, add_special_tokens=False).offsets
+        for start in range(0, len(offsets), step):
+            window = offsets[start:start + chunk_tokens]
+            yield _chunk(doc, doc.page_content[window[0][0]:window[-1][1]])
+            if start + chunk_tokens >= len(offsets):
+                break
+
+
+@register_chunker("sentence")
+def sentence_chunks(docs: Iterable[Document], chunk_size: int = 1000, overlap_sentences: int = 1) -> Iterator[Document]:
+    """Whole sentences packed up to chunk_size characters, repeating the last sentence(s) as overlap"""
+
+    for doc in docs:
+        current: List[str] = []
+        length = 0
+        for sentence in split_sentences(doc.page_content):
+            if current and length + len(sentence) > chunk_size:
+                yield _chunk(doc, " ".join(current))
+                current = current[-overlap_sentences:] if overlap_sentences else []
+                length = sum(len(s) + 1 for s in current)
+            current.append(sentence)
+            length += len(sentence) + 1
+        if current:
+            yield _chunk(doc, " ".join(current))
+
+
+@register_chunker("semantic")
+def semantic_chunks(docs: Iterable[Document], max_chunk_size: int = 1500,
+                    breakpoint_percentile: float = 10) -> Iterator[Document]:
+    """Break between sentences whose embeddings are least similar (bottom percentile), capped at max_chunk_size"""
+
+    from ..embedding.embedder import embed_texts
+
+    for doc in docs:
+        sentences = split_sentences(doc.page_content)
+        if len(sentences) < 3:
+            if sentences:
+                yield _chunk(doc, " ".join(sentences))
+            continue
+
+        embeds = embed_texts(sentences)
+        embeds /= np.maximum(np.linalg.norm(embeds, axis=1, keepdims=True), 1e-12)
+        similarity = np.einsum("ij,ij->i", embeds[:-1], embeds[1:])     # sentence i vs i + 1
+        breaks = similarity < np.percentile(similarity, breakpoint_percentile)
+
+        current = [sentences[0]]
+        length = len(sentences[0])
+        for sentence, is_break in zip(sentences[1:], breaks):
+            if is_break or length + len(sentence) > max_chunk_size:
+                yield _chunk(doc, " ".join(current))
+                current, length = [], 0
+            current.append(sentence)
+            length += len(sentence) + 1
+        yield _chunk(doc, " ".join(current))
+
+
+@register_chunker("fast")
+def fast_chunks(docs: Iterable[Document], chunk_size: int = 1000, chunk_overlap: int = 200) -> Iterator[Document]:
+    """Vectorized fixed windows snapped back to whitespace; for large plain-text files.
+
+    The text is viewed as a UTF-32 code point array so whitespace positions and
+    window boundaries are found with numpy instead of per-character Python.
+    """
+
+    step = chunk_size - chunk_overlap
+    for doc in docs:
+        text = doc.page_content
+        n = len(text)
+        if n <= chunk_size:
+            if text.strip():
+                yield _chunk(doc, text)
+            continue
+
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        spaces = np.flatnonzero((codes == 32) | (codes == 10) | (codes == 9) | (codes == 13))
+
+        starts = np.arange(0, n, step)
+        ends = np.minimum(starts + chunk_size, n)
+        # Last whitespace at or before each window end, if it falls inside the window
+        idx = np.searchsorted(spaces, ends, side="right") - 1
+        snapped = spaces[np.maximum(idx, 0)] if len(spaces) else ends
+        ends = np.where((idx >= 0) & (snapped > starts) & (ends < n), snapped, ends)
+        # Start each window just after the first whitespace at or after its nominal start
+        if len(spaces):
+            sidx = np.searchsorted(spaces, starts, side="left")
+            after = spaces[np.minimum(sidx, len(spaces) - 1)] + 1
+            starts = np.where((starts > 0) & (sidx < len(spaces)) & (after < ends), after, starts)
+        # A window end snapped back further than the overlap (e.g. a long URL) must not leave a gap
+        starts[1:] = np.minimum(starts[1:], ends[:-1])
+
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            chunk = text[start:end].strip()
+            if chunk:
+                yield _chunk(doc, chunk)
+            if end >= n:
+                break
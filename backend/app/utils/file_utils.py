@@ -1,54 +1,94 @@
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-import os
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import repeat
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterable, Iterator, List, Optional
+
+from pypdf import PdfReader
+from langchain_core.documents import Document
 from ..core.config import settings
+from .chunking import get_chunker
+
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Lazily create the process pool used for parallel PDF parsing"""
+
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(max_workers=settings.PDF_PARSE_WORKERS, mp_context=get_context("spawn"))
+    return _pdf_pool
 
 
-def extract_text(contents: bytes, filename: str) -> str:
-    """Extract text from the file contents"""
-    
+def _extract_page_range(shm_name: str, size: int, start: int, end: int) -> List[str]:
+    """Worker: parse pages [start, end) of a PDF held in shared memory"""
+
+    # Spawn workers share the parent's resource tracker, which unlinks the segment if the parent dies
+    shm = SharedMemory(name=shm_name)
     try:
-        if filename.endswith('pdf'):
-            with open("temp.pdf", "wb") as f:
-                f.write(contents)
-            
-            loader = PyPDFLoader("temp.pdf")
-            docs = loader.load()
-            # return "\n".join([doc for doc in docs])
-            return docs
-        
-        elif filename.endswith('txt'):
-            with open("temp.txt", "wb") as f:
-                f.write(contents)
-
-            loader = TextLoader("temp.pdf")
-            docs = loader.load()
-            # return "\n".join([doc for doc in docs])
-            return docs
-        
-    except Exception as e:
-        return f"Failed to extract text from {filename}: {str(e)}"
-    
+        reader = PdfReader(BytesIO(bytes(shm.buf[:size])))
+        return [reader.pages[i].extract_text() for i in range(start, end)]
     finally:
-        temp_file_paths = ["temp.pdf", "temp.pdf"]
-        for temp_file_path in temp_file_paths:
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        shm.close()
 
 
-def chunk_text(text: List[str], method: str = settings.CHUNKING_METHOD) -> List[str]:
-    """Chunk text according to the specified 'method' strategy"""
+def _iter_pdf_pages(reader: PdfReader, contents: bytes, filename: str) -> Iterator[Document]:
+    """Yield one Document per page, parsing large PDFs across the process pool"""
+
+    total_pages = len(reader.pages)
+
+    def page_doc(page: int, text: str) -> Document:
+        return Document(page_content=text, metadata={"source": filename, "page": page, "total_pages": total_pages})
 
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200
-    )
+    if settings.PDF_PARSE_WORKERS <= 1 or total_pages < settings.PDF_PARALLEL_MIN_PAGES:
+        for page, pdf_page in enumerate(reader.pages):
+            yield page_doc(page, pdf_page.extract_text())
+        return
 
-    texts = text_splitter.split_documents(text)
+    # Workers attach to one shared copy of the bytes instead of each receiving a pickled copy
+    shm = SharedMemory(create=True, size=len(contents))
+    try:
+        shm.buf[:len(contents)] = contents
+        step = settings.PDF_PAGES_PER_TASK
+        starts = range(0, total_pages, step)
+        ends = [min(start + step, total_pages) for start in starts]
+
+        results = _get_pdf_pool().map(_extract_page_range, repeat(shm.name), repeat(len(contents)), starts, ends)
+        for start, texts in zip(starts, results):
+            for offset, text in enumerate(texts):
+                yield page_doc(start + offset, text)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def extract_text(contents: bytes, filename: str) -> Iterator[Document]:
+    """Extract text from the in-memory file contents as a stream of page Documents"""
+
+    if filename.endswith('pdf'):
+        try:
+            reader = PdfReader(BytesIO(contents))
+        except Exception as e:
+            raise ValueError(f"Failed to extract text from {filename}: {str(e)}")
+        return _iter_pdf_pages(reader, contents, filename)
 
-    return texts
+    elif filename.endswith('txt'):
+        text = contents.decode("utf-8", errors="replace")
+        return iter([Document(page_content=text, metadata={"source": filename})])
 
+    raise ValueError(f"Failed to extract text from {filename}: unsupported file type")
 
 
+def iter_chunks(docs: Iterable[Document], method: str = settings.CHUNKING_METHOD) -> Iterator[Document]:
+    """Lazily chunk documents one page at a time with the registered `method` chunker"""
+
+    return get_chunker(method)(docs)
+
+
+def chunk_text(text: List[str], method: str = settings.CHUNKING_METHOD) -> List[str]:
+    """Chunk text according to the specified 'method' strategy"""
 
+    return list(iter_chunks(text, method))
@@ -0,0 +1,21 @@
+import threading
+from functools import lru_cache, wraps
+
+
+def locked_cache(fn):
+    """lru_cache for expensive resource factories: concurrent first callers build the resource once.
+
+    `loaded()` reports whether any value was built, without building one.
+    """
+
+    cached = lru_cache(maxsize=None)(fn)
+    lock = threading.RLock()
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with lock:
+            return cached(*args, **kwargs)
+
+    wrapper.cache_clear = cached.cache_clear
+    wrapper.loaded = lambda: cached.cache_info().currsize > 0
+    return wrapper
@@ -0,0 +1,151 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..core.config import settings
+from ..db.models.booking_db import EmailOutbox
+from .send_mail import SMTPMailer, CONFIRMATION_SUBJECT, confirmation_body
+
+
+logger = logging.getLogger(__name__)
+
+
+def utcnow() -> datetime:
+    """Current UTC time as a naive datetime; the outbox DateTime columns store naive UTC"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def queue_confirmation_email(db: Session, full_name, receiver_email, date, time) -> EmailOutbox:
+    """Add a confirmation email to the outbox; committed together with the booking"""
+
+    now = utcnow()
+    entry = EmailOutbox(
+        recipient=receiver_email,
+        subject=CONFIRMATION_SUBJECT,
+        body=confirmation_body(full_name, date, time),
+        status="pending",
+        attempts=0,
+        next_attempt_at=now,
+        created_at=now
+    )
+    db.add(entry)
+    return entry
+
+
+class OutboxWorker:
+    """Background thread that drains the email outbox over one reused SMTP connection.
+
+    Rows are claimed with a conditional UPDATE, so several app workers can drain
+    the same table without sending an email twice. The lease is renewed with the
+    same conditional UPDATE right before each send, so a slow batch cannot outlive
+    it; a row reclaimed by another worker in the meantime is skipped. A claimed row
+    that is never resolved (crashed worker) becomes claimable again after
+    OUTBOX_CLAIM_TIMEOUT.
+    """
+
+    def __init__(self, session_factory: sessionmaker, mailer: Optional[SMTPMailer] = None,
+                 poll_interval: float = settings.OUTBOX_POLL_INTERVAL,
+                 batch_size: int = settings.OUTBOX_BATCH_SIZE,
+                 max_attempts: int = settings.OUTBOX_MAX_ATTEMPTS,
+                 backoff_base: float = settings.OUTBOX_BACKOFF_BASE):
+        self._session_factory = session_factory
+        self._mailer = mailer or SMTPMailer()
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="email-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._mailer.close()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                sent = self.drain_once()
+            except Exception as e:
+                logger.exception("Email outbox worker error: %s", e)
+                sent = 0
+            # Keep draining while there is a backlog, otherwise wait for the next poll
+            if sent < self.batch_size:
+                self._stop.wait(self.poll_interval)
+
+    def _lease(self, db: Session, row_id: int, status: str, held: datetime) -> Optional[datetime]:
+        """Set a fresh lease on a row still in (status, held); returns it, or None if another worker took the row"""
+
+        # Whole seconds, so the value compares equal after a round trip through any database
+        lease = utcnow().replace(microsecond=0) + timedelta(seconds=settings.OUTBOX_CLAIM_TIMEOUT)
+        result = db.execute(
+            update(EmailOutbox)
+            .where(and_(EmailOutbox.id == row_id,
+                        EmailOutbox.status == status,
+                        EmailOutbox.next_attempt_at == held))
+            .values(status="sending", next_attempt_at=lease)
+        )
+        return lease if result.rowcount == 1 else None
+
+    def _claim(self, db: Session) -> list:
+        """Claim a batch of due rows; returns (row_id, lease) pairs"""
+
+        now = utcnow()
+        candidates = db.execute(
+            select(EmailOutbox.id, EmailOutbox.status, EmailOutbox.next_attempt_at)
+            .where(or_(EmailOutbox.status == "pending", EmailOutbox.status == "sending"))
+            .where(EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(self.batch_size)
+        ).all()
+
+        claimed = []
+        for row_id, status, next_attempt_at in candidates:
+            lease = self._lease(db, row_id, status, next_attempt_at)
+            if lease is not None:
+                claimed.append((row_id, lease))
+        db.commit()
+        return claimed
+
+    def drain_once(self) -> int:
+        """Send one batch of due emails; returns how many were sent"""
+
+        sent = 0
+        with self._session_factory() as db:
+            for row_id, lease in self._claim(db):
+                # Earlier sends may have used up most of the claim lease
+                if self._lease(db, row_id, "sending", lease) is None:
+                    db.commit()
+                    continue
+                db.commit()
+                entry = db.get(EmailOutbox, row_id)
+                try:
+                    self._mailer.send(entry.recipient, entry.subject, entry.body)
+                    entry.status = "sent"
+                    entry.sent_at = utcnow()
+                    sent += 1
+                except Exception as e:
+                    self._mailer.close()        # drop a possibly broken connection
+                    entry.attempts += 1
+                    entry.last_error = str(e)
+                    if entry.attempts >= self.max_attempts:
+                        entry.status = "failed"
+                        logger.error("Email to %s failed permanently: %s", entry.recipient, e)
+                    else:
+                        entry.status = "pending"
+                        entry.next_attempt_at = utcnow() + timedelta(
+                            seconds=self.backoff_base * 2 ** (entry.attempts - 1)
+                        )
+                db.commit()
+        return sent
@@ -1,3 +1,4 @@
+import logging
 import smtplib
 
 from email.mime.text import MIMEText
@@ -6,34 +7,77 @@ from email.mime.text import MIMEText
 from ..core.config import settings
 
 
-def send_email(full_name, receiver_email, date, time):
-    """Setup SMTP server"""
-
-    # smtp_server = "smtp.gmail.com"
-    smtp_server = "live.smtp.mailtrap.io"
-    smtp_port = 587
-    login = "api"
-    password = settings.MAILTRAP_API_KEY
-    sender_mail = "hello@demomailtrap.co"
-    try:
-        msg = MIMEText(
-            f"Hi {full_name}, your interview is scheduled on {date} at {time}."
-        )
-        msg["Subject"] = "Interview Booking Confirmation"
-        # msg["From"] = settings.SENDER_EMAIL
-        msg["From"] = sender_mail
-        msg["To"] = receiver_email
+logger = logging.getLogger(__name__)
+
+
+CONFIRMATION_SUBJECT = "Interview Booking Confirmation"
+
+
+def confirmation_body(full_name, date, time) -> str:
+    return f"Hi {full_name}, your interview is scheduled on {date} at {time}."
+
+
+class SMTPMailer:
+    """Reusable SMTP connection; STARTTLS + login happen once per connection, not per email"""
+
+    def __init__(self, host: str = settings.SMTP_HOST, port: int = settings.SMTP_PORT,
+                 login: str = settings.SMTP_LOGIN, password: str = settings.SMTP_PASSWORD,
+                 starttls: bool = settings.SMTP_STARTTLS, sender: str = settings.SMTP_SENDER,
+                 timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.login = login
+        self.password = password
+        self.starttls = starttls
+        self.sender = sender
+        self.timeout = timeout
+        self._server = None
 
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
             server.starttls()
-            # server.login(settings.SENDER_EMAIL, settings.SENDER_MAIL_PASSWORD)
-            server.login(login, password)
-            # server.send_message(msg)
-            # server.sendmail(settings.SENDER_EMAIL, receiver_email, msg.as_string())
-            server.sendmail(sender_mail, receiver_email, msg.as_string())
+        if self.login and self.password:
+            server.login(self.login, self.password)
+        self._server = server
 
-        print("[DEBUG] Email sent successfully")
+    def send(self, receiver_email: str, subject: str, body: str):
+        """Send one message, raising on failure"""
+
+        msg = MIMEText(body)
+        msg["Subject"] = subject
+        msg["From"] = self.sender
+        msg["To"] = receiver_email
+
+        if self._server is None:
+            self._connect()
+        try:
+            self._server.sendmail(self.sender, receiver_email, msg.as_string())
+        except smtplib.SMTPServerDisconnected:
+            # Idle connection was closed by the server; reconnect once and retry
+            self.close()
+            self._connect()
+            self._server.sendmail(self.sender, receiver_email, msg.as_string())
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+
+def send_email(full_name, receiver_email, date, time):
+    """Send a booking confirmation over a one-off connection"""
+
+    mailer = SMTPMailer()
+    try:
+        mailer.send(receiver_email, CONFIRMATION_SUBJECT, confirmation_body(full_name, date, time))
+        logger.debug("Email sent to %s", receiver_email)
 
     except Exception as e:
         return f"Error while sending mail: {str(e)}"
 
+    finally:
+        mailer.close()
@@ -0,0 +1,20 @@
+import logging
+from functools import lru_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(model_name: str):
+    """Load a HF fast tokenizer once per model; None when it cannot be loaded"""
+
+    try:
+        from tokenizers import Tokenizer
+        tokenizer = Tokenizer.from_pretrained(model_name)
+        tokenizer.no_truncation()
+        tokenizer.no_padding()
+        return tokenizer
+    except Exception as e:
+        logger.warning("Tokenizer %s unavailable: %s", model_name, e)
+        return None
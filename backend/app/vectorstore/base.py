@@ -0,0 +1,39 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+
+@dataclass
+class Match:
+    id: str
+    score: float
+    metadata: dict = field(default_factory=dict)
+
+
+@dataclass
+class QueryResponse:
+    matches: List[Match]
+
+
+class VectorStore(ABC):
+    """Common surface of the vector store backends"""
+
+    @abstractmethod
+    def upsert(self, vectors: List[dict]) -> dict:
+        """Insert or overwrite Pinecone style {"id", "values", "metadata"} dicts"""
+
+    @abstractmethod
+    def query(self, vector: Sequence[float], top_k: int = 3, include_metadata: bool = True) -> QueryResponse:
+        """Return the top_k most similar vectors by cosine similarity"""
+
+    @abstractmethod
+    def delete(self, ids: List[str]) -> None:
+        """Remove vectors by id"""
+
+    @abstractmethod
+    def fetch(self, ids: List[str]) -> Dict[str, dict]:
+        """Return {id: metadata} for the ids that exist"""
+
+    @abstractmethod
+    def list_ids(self, prefix: str = "") -> List[str]:
+        """Ids of the stored vectors that start with `prefix`"""
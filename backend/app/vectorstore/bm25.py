@@ -0,0 +1,272 @@
+import os
+import re
+import threading
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:     # not available on Windows
+    fcntl = None
+
+
+_TOKEN = re.compile(r"\w+(?:[-./]\w+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words; codes such as 'SKU-1234' or 'v2.3' are kept whole and also split into parts"""
+
+    tokens = []
+    for match in _TOKEN.finditer(text.lower()):
+        token = match.group()
+        tokens.append(token)
+        parts = re.split(r"[-./]", token)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive lock across processes (uvicorn workers each run their own ingestion jobs)"""
+
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class BM25Index:
+    """Incremental in-process BM25 index with compact array-based postings.
+
+    Each term owns two typed arrays: document numbers and term frequencies.
+    Documents are appended and never renumbered; deleted or replaced documents
+    are tombstoned and skipped at query time. The index is saved as a single
+    .npz of flat arrays and reloaded when another process rewrote it.
+
+    Several processes may write: changes made since the last save are kept as a
+    log, and save() holds a file lock, reloads whatever another process saved in
+    the meantime and replays the log on top before writing.
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.2, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._loaded_version: Optional[tuple] = None
+        self._pending: List[Tuple[str, Optional[str]]] = []    # (doc_id, text) adds, (doc_id, None) deletes
+        self._reset()
+
+    def _reset(self):
+        self._doc_ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._doc_len = array("I")
+        self._deleted = bytearray()
+        self._terms: Dict[str, int] = {}
+        self._post_docs: List[array] = []
+        self._post_tfs: List[array] = []
+        self._live_len_total = 0
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, doc_id: str) -> bool:
+        with self._lock:
+            self._maybe_reload()
+            return doc_id in self._positions
+
+    def add(self, docs: Iterable[Tuple[str, str]]):
+        """Index (doc_id, text) pairs, replacing documents that already exist"""
+
+        with self._lock:
+            self._maybe_reload()
+            for doc_id, text in docs:
+                self._pending.append((doc_id, text))
+                self._add_one(doc_id, text)
+
+    def _add_one(self, doc_id: str, text: str):
+        self._delete_one(doc_id)
+        num = len(self._doc_ids)
+        tokens = tokenize(text)
+        self._doc_ids.append(doc_id)
+        self._positions[doc_id] = num
+        self._doc_len.append(len(tokens))
+        self._deleted.append(0)
+        self._live_len_total += len(tokens)
+
+        for term, tf in Counter(tokens).items():
+            term_id = self._terms.get(term)
+            if term_id is None:
+                term_id = self._terms[term] = len(self._post_docs)
+                self._post_docs.append(array("I"))
+                self._post_tfs.append(array("I"))
+            self._post_docs[term_id].append(num)
+            self._post_tfs[term_id].append(tf)
+
+    def delete(self, doc_ids: Iterable[str]):
+        with self._lock:
+            self._maybe_reload()
+            for doc_id in doc_ids:
+                self._pending.append((doc_id, None))
+                self._delete_one(doc_id)
+
+    def ids(self, prefix: str = "") -> List[str]:
+        with self._lock:
+            self._maybe_reload()
+            return [doc_id for doc_id in self._positions if doc_id.startswith(prefix)]
+
+    def _delete_one(self, doc_id: str):
+        num = self._positions.pop(doc_id, None)
+        if num is not None:
+            self._deleted[num] = 1
+            self._live_len_total -= self._doc_len[num]
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """Return up to top_k (doc_id, score) pairs by BM25 score"""
+
+        with self._lock:
+            self._maybe_reload()
+            n_live = len(self._positions)
+            if not n_live:
+                return []
+
+            doc_len = np.frombuffer(self._doc_len, dtype=np.uint32).astype(np.float32)
+            avgdl = max(self._live_len_total / n_live, 1.0)
+            norm = self.k1 * (1 - self.b + self.b * doc_len / avgdl)
+            scores = np.zeros(len(self._doc_ids), dtype=np.float32)
+
+            for term in set(tokenize(query)):
+                term_id = self._terms.get(term)
+                if term_id is None:
+                    continue
+                docs = np.frombuffer(self._post_docs[term_id], dtype=np.uint32)
+                tfs = np.frombuffer(self._post_tfs[term_id], dtype=np.uint32).astype(np.float32)
+                df = len(docs)      # includes tombstoned docs until the next compaction
+                idf = np.log(1 + (n_live - df + 0.5) / (df + 0.5))
+                scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm[docs])
+
+            scores[np.frombuffer(bytes(self._deleted), dtype=np.uint8).astype(bool)] = 0
+            k = min(top_k, int(np.count_nonzero(scores)))
+            if k == 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._doc_ids[i], float(scores[i])) for i in top]
+
+    def compact(self):
+        """Drop tombstoned documents and renumber postings"""
+
+        with self._lock:
+            live = [(doc_id, num) for doc_id, num in self._positions.items()]
+            remap = np.full(len(self._doc_ids), -1, dtype=np.int64)
+            for new, (_, old) in enumerate(sorted(live, key=lambda x: x[1])):
+                remap[old] = new
+
+            post_docs, post_tfs, terms = [], [], {}
+            for term, term_id in self._terms.items():
+                docs = remap[np.frombuffer(self._post_docs[term_id], dtype=np.uint32)]
+                keep = docs >= 0
+                if keep.any():
+                    terms[term] = len(post_docs)
+                    post_docs.append(array("I", docs[keep].astype(np.uint32).tobytes()))
+                    post_tfs.append(array("I", np.frombuffer(self._post_tfs[term_id], dtype=np.uint32)[keep].tobytes()))
+
+            order = sorted(live, key=lambda x: x[1])
+            self._doc_len = array("I", [self._doc_len[old] for _, old in order])
+            self._doc_ids = [doc_id for doc_id, _ in order]
+            self._positions = {doc_id: i for i, doc_id in enumerate(self._doc_ids)}
+            self._deleted = bytearray(len(self._doc_ids))
+            self._terms, self._post_docs, self._post_tfs = terms, post_docs, post_tfs
+
+    def save(self):
+        """Write the index as flat arrays: postings are concatenated with per-term offsets"""
+
+        if not self.path:
+            return
+        with self._lock, _file_lock(self.path + ".lock"):
+            self._maybe_reload()        # merge what other processes saved since our last load
+            if len(self._deleted) and sum(self._deleted) > len(self._deleted) // 4:
+                self.compact()
+
+            lengths = np.array([len(p) for p in self._post_docs], dtype=np.int64)
+            offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp.npz"
+            np.savez(
+                tmp,
+                terms=np.array(sorted(self._terms, key=self._terms.get), dtype=str),
+                offsets=offsets,
+                post_docs=np.frombuffer(b"".join(p.tobytes() for p in self._post_docs), dtype=np.uint32),
+                post_tfs=np.frombuffer(b"".join(p.tobytes() for p in self._post_tfs), dtype=np.uint32),
+                doc_ids=np.array(self._doc_ids, dtype=str),
+                doc_len=np.frombuffer(self._doc_len, dtype=np.uint32),
+                deleted=np.frombuffer(bytes(self._deleted), dtype=np.uint8),
+            )
+            os.replace(tmp, self.path)
+            self._loaded_version = self._file_version()
+            self._pending.clear()
+
+    def _file_version(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _maybe_reload(self):
+        """Load from disk on first use, and again whenever another process saved a newer file.
+
+        Unsaved local changes are replayed on top of the reloaded index.
+        """
+
+        if not self.path:
+            return
+        version = self._file_version()
+        if version is None or version == self._loaded_version:
+            return
+
+        with np.load(self.path) as data:
+            self._reset()
+            offsets = data["offsets"]
+            post_docs, post_tfs = data["post_docs"], data["post_tfs"]
+            for term_id, term in enumerate(data["terms"].tolist()):
+                self._terms[term] = term_id
+                start, end = offsets[term_id], offsets[term_id + 1]
+                self._post_docs.append(array("I", post_docs[start:end].tobytes()))
+                self._post_tfs.append(array("I", post_tfs[start:end].tobytes()))
+            self._doc_ids = data["doc_ids"].tolist()
+            self._doc_len = array("I", data["doc_len"].tobytes())
+            self._deleted = bytearray(data["deleted"].tobytes())
+
+        for num, doc_id in enumerate(self._doc_ids):
+            if not self._deleted[num]:
+                self._positions[doc_id] = num
+                self._live_len_total += self._doc_len[num]
+        self._loaded_version = version
+
+        for doc_id, text in self._pending:
+            if text is None:
+                self._delete_one(doc_id)
+            else:
+                self._add_one(doc_id, text)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[str]:
+    """Fuse ranked id lists: score(d) = sum over lists of 1 / (k + rank)"""
+
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
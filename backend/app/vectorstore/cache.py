@@ -0,0 +1,100 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import Optional
+
+from redis import Redis
+
+from ..core.config import settings
+from ..embedding.cache import normalize_query
+from ..utils.lru import LRUTTLCache
+from ..core.metrics import cache_stats
+
+
+logger = logging.getLogger(__name__)
+
+
+CORPUS_VERSION_KEY = "rag:corpus_version"
+
+
+class CorpusVersion:
+    """Monotonic counter bumped after every successful upsert.
+
+    Kept in Redis so all workers see the same version; without a Redis URL a
+    process-local counter is used. While a configured Redis is unreachable the
+    version is None and callers skip caching: a local counter could repeat an
+    older Redis version and would miss other workers' uploads. A bump that did
+    not reach Redis is applied once it is reachable again.
+    """
+
+    def __init__(self, redis_url: Optional[str] = settings.REDIS_CACHE_URL):
+        self._redis = Redis.from_url(redis_url) if redis_url else None
+        self._local = 0
+        self._missed_bump = False
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[int]:
+        if self._redis is None:
+            with self._lock:
+                return self._local
+        try:
+            if self._missed_bump:
+                version = int(self._redis.incr(CORPUS_VERSION_KEY))
+                self._missed_bump = False
+                return version
+            return int(self._redis.get(CORPUS_VERSION_KEY) or 0)
+        except Exception as e:
+            logger.warning("Corpus version: Redis unavailable, retrieval cache bypassed: %s", e)
+            return None
+
+    def bump(self) -> Optional[int]:
+        if self._redis is None:
+            with self._lock:
+                self._local += 1
+                return self._local
+        try:
+            return int(self._redis.incr(CORPUS_VERSION_KEY))
+        except Exception as e:
+            logger.warning("Corpus version: Redis unavailable, bump deferred: %s", e)
+            self._missed_bump = True
+            return None
+
+
+class RetrievalCache:
+    """Caches formatted retrieval results per (query, top_k, filter, corpus version).
+
+    Callers read the corpus version once, before searching, and pass it to both
+    get and set: a result computed while an upload bumped the version is then
+    stored under the old version and never served as current.
+    """
+
+    def __init__(self, version: CorpusVersion, maxsize: int = 1024, ttl: int = 3600):
+        self.version = version
+        self._entries = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+
+    def _key(self, query: str, top_k: int, version: int, filter: Optional[dict]) -> str:
+        raw = json.dumps([normalize_query(query), top_k, filter, version], sort_keys=True)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, query: str, top_k: int, version: Optional[int], filter: Optional[dict] = None) -> Optional[str]:
+        if version is None:         # corpus version unknown
+            return None
+        return self._entries.get(self._key(query, top_k, version, filter))
+
+    def set(self, query: str, top_k: int, version: Optional[int], result: str, filter: Optional[dict] = None):
+        if version is None:
+            return
+        self._entries.set(self._key(query, top_k, version, filter), result)
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+corpus_version = CorpusVersion()
+retrieval_cache = RetrievalCache(
+    corpus_version,
+    maxsize=settings.RETRIEVAL_CACHE_SIZE,
+    ttl=settings.RETRIEVAL_CACHE_TTL
+)
+cache_stats.register("retrieval", retrieval_cache.stats)
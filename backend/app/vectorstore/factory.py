@@ -0,0 +1,30 @@
+from ..core.config import settings
+from ..utils.lazy import locked_cache
+from .base import VectorStore
+from .bm25 import BM25Index
+
+
+@locked_cache
+def get_vector_store(backend: str = settings.VECTOR_STORE_BACKEND) -> VectorStore:
+    """Return the process-wide vector store for the configured backend"""
+
+    if backend == "pinecone":
+        from .pinecone_store import PineconeVectorStore
+        return PineconeVectorStore()
+
+    if backend == "local":
+        from .local import LocalVectorStore
+        return LocalVectorStore()
+
+    if backend == "memory":
+        from .memory import InMemoryIndex
+        return InMemoryIndex()
+
+    raise ValueError(f"Unknown vector store backend: {backend}")
+
+
+@locked_cache
+def get_sparse_index(path: str = settings.BM25_INDEX_PATH) -> BM25Index:
+    """Return the process-wide BM25 index, loaded from `path` on first use"""
+
+    return BM25Index(path)
@@ -0,0 +1,250 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..core.config import settings
+from .base import Match, QueryResponse, VectorStore
+from .bm25 import _file_lock
+
+try:
+    import faiss
+except ImportError:     # optional dependency, only needed for the ivf/hnsw indexes
+    faiss = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class LocalVectorStore(VectorStore):
+    """On-disk vector store searched in-process.
+
+    Layout of `path`:
+        vectors.f32    row-major float32 matrix of L2-normalized vectors, memory-mapped for search
+        rows.jsonl     one {"row", "id", "metadata"} line per matrix row, in row order
+        deleted.jsonl  row numbers that were deleted or overwritten
+        write.lock     held while appending, so several processes can share the directory
+
+    All three files are append-only. Every call first reads the lines other
+    processes appended since the last one, and writers do so under the file lock,
+    so row numbers are never handed out twice.
+
+    Search is brute-force cosine over the memmap unless `index_type` is "ivf" or
+    "hnsw" and faiss is installed, in which case an ANN index is built lazily and
+    persisted next to the data. Nothing is read from disk until first use.
+    """
+
+    def __init__(self, path: str = settings.LOCAL_VECTOR_STORE_PATH,
+                 index_type: str = settings.LOCAL_VECTOR_INDEX,
+                 dim: int = settings.EMBEDDING_DIM):
+        self.path = path
+        self.dim = dim
+        self.index_type = index_type
+        if index_type != "flat" and faiss is None:
+            logger.warning("faiss is not installed; falling back to flat search instead of '%s'", index_type)
+            self.index_type = "flat"
+
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._rows_path = os.path.join(path, "rows.jsonl")
+        self._deleted_path = os.path.join(path, "deleted.jsonl")
+        self._lock_path = os.path.join(path, "write.lock")
+        self._ann_path = os.path.join(path, f"{self.index_type}.faiss")
+
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._rows_read = 0                     # bytes of rows.jsonl already applied
+        self._deleted_read = 0                  # bytes of deleted.jsonl already applied
+        self._ids: List[str] = []
+        self._offsets: List[int] = []           # byte offset of each row in rows.jsonl
+        self._positions: Dict[str, int] = {}    # id -> live row
+        self._deleted = np.zeros(0, dtype=bool)
+        self._matrix: Optional[np.ndarray] = None
+        self._ann = None
+
+    def _load(self):
+        """Apply the rows and tombstones appended since the last call, by any process"""
+
+        if not self._loaded:
+            os.makedirs(self.path, exist_ok=True)
+            if self.index_type != "flat" and os.path.exists(self._ann_path):
+                self._ann = faiss.read_index(self._ann_path)
+            self._loaded = True
+
+        rows_before = len(self._ids)
+        for offset, line in self._new_lines(self._rows_path, self._rows_read):
+            record = json.loads(line)
+            row = record.get("row", len(self._ids))     # files written before rows were numbered
+            if row != len(self._ids):
+                raise ValueError(f"{self._rows_path} is corrupt: expected row {len(self._ids)}, found {row}")
+            self._positions[record["id"]] = row
+            self._ids.append(record["id"])
+            self._offsets.append(offset)
+            self._rows_read = offset + len(line)
+        if len(self._ids) > rows_before:
+            self._deleted = np.concatenate([self._deleted, np.zeros(len(self._ids) - rows_before, dtype=bool)])
+            self._remap()
+
+        for offset, line in self._new_lines(self._deleted_path, self._deleted_read):
+            row = int(line)
+            if row >= len(self._ids):
+                break           # tombstone of a row appended after the rows were read; applied next time
+            self._deleted[row] = True
+            if self._positions.get(self._ids[row]) == row:
+                del self._positions[self._ids[row]]
+            self._deleted_read = offset + len(line)
+
+    @staticmethod
+    def _new_lines(path: str, start: int):
+        """(byte offset, line) pairs of the complete lines after `start`"""
+
+        try:
+            if os.path.getsize(path) <= start:
+                return []
+        except FileNotFoundError:
+            return []
+        with open(path, "rb") as f:
+            f.seek(start)
+            data = f.read()
+        data = data[:data.rfind(b"\n") + 1]         # skip a line that is still being written
+        lines, offset = [], start
+        for line in data.splitlines(keepends=True):
+            lines.append((offset, line))
+            offset += len(line)
+        return lines
+
+    def _remap(self):
+        rows = len(self._ids)
+        self._matrix = (
+            np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+            if rows else np.empty((0, self.dim), dtype=np.float32)
+        )
+
+    def upsert(self, vectors: List[dict]) -> dict:
+        if not vectors:
+            return {"upserted_count": 0}
+        # Last occurrence wins; a repeated id would otherwise leave an earlier row live
+        vectors = list({v["id"]: v for v in vectors}.values())
+
+        values = np.asarray([v["values"] for v in vectors], dtype=np.float32)
+        norms = np.linalg.norm(values, axis=1, keepdims=True)
+        values /= np.where(norms == 0, 1.0, norms)
+
+        with self._lock, _file_lock(self._lock_path):
+            self._load()
+            self._tombstone([v["id"] for v in vectors])
+            first = len(self._ids)
+
+            # Vectors go first: a row line is only ever read once its vector is on disk.
+            # Written at the row's offset, so vectors left behind by a crashed writer are overwritten.
+            mode = "r+b" if os.path.exists(self._vectors_path) else "wb"
+            with open(self._vectors_path, mode) as f:
+                f.seek(first * self.dim * values.itemsize)
+                f.write(np.ascontiguousarray(values).tobytes())
+                f.truncate()
+
+            with open(self._rows_path, "ab") as f:
+                f.write(b"".join(
+                    json.dumps({"row": first + i, "id": v["id"], "metadata": v.get("metadata") or {}}).encode() + b"\n"
+                    for i, v in enumerate(vectors)
+                ))
+            self._load()
+
+        return {"upserted_count": len(vectors)}
+
+    def delete(self, ids: List[str]) -> None:
+        with self._lock, _file_lock(self._lock_path):
+            self._load()
+            self._tombstone(ids)
+            self._load()
+
+    def _tombstone(self, ids: List[str]):
+        """Append tombstones for the live rows of `ids`; applied by the next _load"""
+
+        rows = [self._positions[i] for i in ids if i in self._positions]
+        if rows:
+            with open(self._deleted_path, "a") as f:
+                f.writelines(f"{row}\n" for row in rows)
+
+    def query(self, vector: Sequence[float], top_k: int = 3, include_metadata: bool = True) -> QueryResponse:
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)      # not in place: it may be the caller's array
+
+        with self._lock:
+            self._load()
+            if not self._positions:
+                return QueryResponse(matches=[])
+            if self.index_type == "flat":
+                rows, scores = self._search_flat(query, top_k)
+            else:
+                rows, scores = self._search_ann(query, top_k)
+            ids = [self._ids[row] for row in rows]
+            metadata = self._read_metadata(rows) if include_metadata else [{} for _ in rows]
+
+        return QueryResponse(matches=[
+            Match(id=row_id, score=float(score), metadata=meta)
+            for row_id, score, meta in zip(ids, scores, metadata)
+        ])
+
+    def _search_flat(self, query: np.ndarray, top_k: int):
+        scores = self._matrix @ query
+        scores[self._deleted] = -np.inf
+        k = min(top_k, len(self._positions))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return top.tolist(), scores[top].tolist()
+
+    def _search_ann(self, query: np.ndarray, top_k: int):
+        self._sync_ann()
+        # Over-fetch so that tombstoned rows can be dropped without an index rebuild
+        fetch = min(len(self._ids), top_k + int(self._deleted.sum()))
+        scores, rows = self._ann.search(query.reshape(1, -1), fetch)
+        # The persisted index may have come from a process that had read more rows
+        hits = [(row, score) for row, score in zip(rows[0], scores[0])
+                if 0 <= row < len(self._ids) and not self._deleted[row]][:top_k]
+        return [int(row) for row, _ in hits], [float(score) for _, score in hits]
+
+    def _sync_ann(self):
+        """Build the ANN index on first use and add rows appended since"""
+
+        if self._ann is None:
+            if self.index_type == "hnsw":
+                self._ann = faiss.IndexHNSWFlat(self.dim, 32, faiss.METRIC_INNER_PRODUCT)
+            else:
+                nlist = max(1, int(np.sqrt(len(self._ids))))
+                self._ann = faiss.IndexIVFFlat(faiss.IndexFlatIP(self.dim), self.dim, nlist,
+                                               faiss.METRIC_INNER_PRODUCT)
+                self._ann.train(np.ascontiguousarray(self._matrix))
+                self._ann.nprobe = max(1, nlist // 8)
+
+        if self._ann.ntotal < len(self._ids):
+            self._ann.add(np.ascontiguousarray(self._matrix[self._ann.ntotal:]))
+            tmp = f"{self._ann_path}.{os.getpid()}.tmp"      # other processes may read it at any time
+            faiss.write_index(self._ann, tmp)
+            os.replace(tmp, self._ann_path)
+
+    def fetch(self, ids: List[str]) -> Dict[str, dict]:
+        with self._lock:
+            self._load()
+            found = [i for i in ids if i in self._positions]
+            return dict(zip(found, self._read_metadata([self._positions[i] for i in found])))
+
+    def list_ids(self, prefix: str = "") -> List[str]:
+        with self._lock:
+            self._load()
+            return [vec_id for vec_id in self._positions if vec_id.startswith(prefix)]
+
+    def _read_metadata(self, rows: List[int]) -> List[dict]:
+        metadata = []
+        with open(self._rows_path, "rb") as f:
+            for row in rows:
+                f.seek(self._offsets[row])
+                metadata.append(json.loads(f.readline())["metadata"])
+        return metadata
+
+    def describe_index_stats(self) -> dict:
+        with self._lock:
+            self._load()
+            return {"total_vector_count": len(self._positions), "rows_on_disk": len(self._ids)}
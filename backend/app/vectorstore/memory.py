@@ -0,0 +1,77 @@
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .base import Match, QueryResponse, VectorStore
+
+
+class InMemoryIndex(VectorStore):
+    """Local stand-in for a Pinecone index with the same upsert/query surface"""
+
+    def __init__(self):
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._metadata: List[dict] = []
+        self._vectors: List[np.ndarray] = []
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors: List[dict], namespace: Optional[str] = None) -> dict:
+        """Insert or overwrite vectors given as Pinecone style dicts"""
+
+        with self._lock:
+            for vector in vectors:
+                values = np.asarray(vector["values"], dtype=np.float32)
+                metadata = dict(vector.get("metadata") or {})
+                pos = self._positions.get(vector["id"])
+                if pos is None:
+                    self._positions[vector["id"]] = len(self._ids)
+                    self._ids.append(vector["id"])
+                    self._vectors.append(values)
+                    self._metadata.append(metadata)
+                else:
+                    self._vectors[pos] = values
+                    self._metadata[pos] = metadata
+
+        return {"upserted_count": len(vectors)}
+
+    def query(self, vector, top_k: int = 3, include_metadata: bool = True, **kwargs) -> QueryResponse:
+        """Brute force cosine search"""
+
+        with self._lock:
+            if not self._vectors:
+                return QueryResponse(matches=[])
+            matrix = np.stack(self._vectors)
+            ids, metadata = list(self._ids), list(self._metadata)
+
+        query = np.asarray(vector, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+        scores = matrix @ query / np.where(norms == 0, 1.0, norms)
+
+        top = np.argsort(-scores)[:top_k]
+        return QueryResponse(matches=[
+            Match(id=ids[i], score=float(scores[i]), metadata=metadata[i] if include_metadata else {})
+            for i in top
+        ])
+
+    def delete(self, ids: List[str]) -> None:
+        with self._lock:
+            drop = {self._positions[i] for i in ids if i in self._positions}
+            if not drop:
+                return
+            keep = [pos for pos in range(len(self._ids)) if pos not in drop]
+            self._ids = [self._ids[pos] for pos in keep]
+            self._vectors = [self._vectors[pos] for pos in keep]
+            self._metadata = [self._metadata[pos] for pos in keep]
+            self._positions = {vec_id: pos for pos, vec_id in enumerate(self._ids)}
+
+    def fetch(self, ids: List[str]) -> Dict[str, dict]:
+        with self._lock:
+            return {i: dict(self._metadata[self._positions[i]]) for i in ids if i in self._positions}
+
+    def list_ids(self, prefix: str = "") -> List[str]:
+        with self._lock:
+            return [vec_id for vec_id in self._ids if vec_id.startswith(prefix)]
+
+    def describe_index_stats(self) -> dict:
+        return {"total_vector_count": len(self._ids)}
@@ -0,0 +1,57 @@
+from typing import Dict, List, Sequence
+
+from pinecone import Pinecone, ServerlessSpec
+
+from ..core.config import settings
+from .base import Match, QueryResponse, VectorStore
+
+
+class PineconeVectorStore(VectorStore):
+    """Remote Pinecone serverless index"""
+
+    def __init__(self, index_name: str = settings.PINECONE_INDEX_NAME, create: bool = True):
+        pc = Pinecone(api_key=settings.PINECONE_API_KEY)
+
+        if create and not pc.has_index(index_name):
+            pc.create_index(
+                name=index_name,
+                vector_type="dense",
+                dimension=settings.EMBEDDING_DIM,
+                metric="cosine",
+                spec=ServerlessSpec(
+                    cloud="aws",
+                    region="us-east-1"
+                )
+            )
+
+        self._index = pc.Index(index_name)
+
+    def upsert(self, vectors: List[dict]) -> dict:
+        return self._index.upsert(vectors=vectors)
+
+    def query(self, vector: Sequence[float], top_k: int = 3, include_metadata: bool = True) -> QueryResponse:
+        results = self._index.query(
+            # namespace=settings.PINECONE_NAMESPACE
+            vector=list(vector),
+            top_k=top_k,
+            include_metadata=include_metadata,
+            include_values=False
+        )
+        return QueryResponse(matches=[
+            Match(id=m.id, score=m.score, metadata=dict(m.metadata or {}))
+            for m in getattr(results, "matches", [])
+        ])
+
+    def delete(self, ids: List[str]) -> None:
+        if ids:
+            self._index.delete(ids=ids)
+
+    def fetch(self, ids: List[str]) -> Dict[str, dict]:
+        if not ids:
+            return {}
+        results = self._index.fetch(ids=list(ids))
+        return {vec_id: dict(vec.metadata or {}) for vec_id, vec in results.vectors.items()}
+
+    def list_ids(self, prefix: str = "") -> List[str]:
+        # Paginated id listing; available on serverless indexes
+        return [vec_id for page in self._index.list(prefix=prefix or None) for vec_id in page]
@@ -0,0 +1,94 @@
+"""Concurrent booking load test against a SQLite (default) or Postgres stand-in.
+
+Every booking checks a pooled session out of the engine built by
+app.db.session.engine_kwargs; the run fails if any booking is lost or crossed.
+
+Run from the backend directory:
+    python -m benchmarks.booking_load --bookings 500 --concurrency 32
+    python -m benchmarks.booking_load --url postgresql+psycopg2://user:pw@localhost/bench
+    python -m benchmarks.booking_load --async-url sqlite+aiosqlite:///bench_async.db
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("DB_URL", f"sqlite:///{_tmp}/files.db")
+os.environ.setdefault("BOOKING_INFO_DB_URL", f"sqlite:///{_tmp}/booking.db")
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.agent import tools
+from app.db.session import Base, engine_kwargs
+from app.db.models.booking_db import BookingInfo
+
+
+def booking_state(i: int) -> dict:
+    day = (date.today() + timedelta(days=1 + i % 30)).isoformat()
+    return {"booking": {"full_name": f"User {chr(65 + i % 26)}", "email": f"user{i}@example.com", "date": day}}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=os.environ["BOOKING_INFO_DB_URL"])
+    parser.add_argument("--async-url", default=None)
+    parser.add_argument("--bookings", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url, **engine_kwargs(args.url))
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    with SessionLocal() as db:
+        before = db.scalar(select(func.count()).select_from(BookingInfo))
+
+    async_factory = None
+    if args.async_url:
+        async_engine = create_async_engine(args.async_url, **engine_kwargs(args.async_url))
+        async_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    tool = tools.InterviewBookingTool(SessionLocal, async_factory)
+
+    start = time.perf_counter()
+    if async_factory is None:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(
+                lambda i: tool._run(booking_state(i), f"call-{i}", time="9am"), range(args.bookings)
+            ))
+    else:
+        async def run():
+            sem = asyncio.Semaphore(args.concurrency)
+
+            async def book(i):
+                async with sem:
+                    return await tool._arun(booking_state(i), f"call-{i}", time="9am")
+
+            try:
+                return await asyncio.gather(*(book(i) for i in range(args.bookings)))
+            finally:
+                await async_engine.dispose()        # aiosqlite's worker threads keep the process alive otherwise
+
+        results = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if not r.update["messages"][0].content.startswith("Booking confirmed")]
+    with SessionLocal() as db:
+        written = db.scalar(select(func.count()).select_from(BookingInfo)) - before
+        emails = set(db.scalars(select(BookingInfo.email)))
+
+    missing = [i for i in range(args.bookings) if f"user{i}@example.com" not in emails]
+    print(f"{args.bookings} bookings, concurrency {args.concurrency}: {elapsed:.2f}s "
+          f"({args.bookings / elapsed:.1f} bookings/sec)")
+    print(f"rows written {written}, failed {len(failed)}, missing {len(missing)}")
+    if failed or missing or written != args.bookings:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
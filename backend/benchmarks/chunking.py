@@ -0,0 +1,81 @@
+"""Benchmark the registered chunkers for throughput and retrieval quality.
+
+Throughput is chunks/sec and MB/sec of chunking alone. Retrieval quality is
+recall@k: a random sentence from the corpus is used as the query, and a hit
+means a chunk containing that sentence is among the top k chunks by cosine
+similarity.
+
+Run from the backend directory:
+    python -m benchmarks.chunking --file manual.txt --queries 200
+    python -m benchmarks.chunking --methods recursive fast --no-quality
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.embedding.embedder import embed_texts
+from app.utils.chunking import CHUNKERS, split_sentences
+from benchmarks.embedding_throughput import make_chunks
+
+
+def load_corpus(path, pages):
+    if path:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        return [Document(page_content=text, metadata={"source": path})]
+    # Synthetic pages of sentences
+    rng = random.Random(0)
+    docs = []
+    for i, words in enumerate(make_chunks(pages, size=3000)):
+        tokens = words.split()
+        sentences, pos = [], 0
+        while pos < len(tokens):
+            n = rng.randint(6, 20)
+            sentences.append(" ".join(tokens[pos:pos + n]).capitalize() + ".")
+            pos += n
+        docs.append(Document(page_content=" ".join(sentences), metadata={"page": i}))
+    return docs
+
+
+def recall_at_k(chunks, docs, queries, k, rng):
+    sentences = [s for doc in docs for s in split_sentences(doc.page_content) if len(s) > 40]
+    sample = rng.sample(sentences, min(queries, len(sentences)))
+
+    chunk_vecs = embed_texts([c.page_content for c in chunks])
+    query_vecs = embed_texts(sample)
+    chunk_vecs /= np.maximum(np.linalg.norm(chunk_vecs, axis=1, keepdims=True), 1e-12)
+    query_vecs /= np.maximum(np.linalg.norm(query_vecs, axis=1, keepdims=True), 1e-12)
+
+    top = np.argsort(-(query_vecs @ chunk_vecs.T), axis=1)[:, :k]
+    hits = sum(any(q.rstrip(".") in chunks[i].page_content for i in row) for q, row in zip(sample, top))
+    return hits / len(sample)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", default=None)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--methods", nargs="+", default=sorted(CHUNKERS))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--no-quality", action="store_true")
+    args = parser.parse_args()
+
+    docs = load_corpus(args.file, args.pages)
+    size_mb = sum(len(d.page_content) for d in docs) / 2**20
+
+    print(f"{'method':<10} {'chunks':>7} {'chunks/s':>10} {'MB/s':>8} {'recall@' + str(args.k):>9}")
+    for method in args.methods:
+        start = time.perf_counter()
+        chunks = list(CHUNKERS[method](docs))
+        elapsed = time.perf_counter() - start
+
+        recall = "-" if args.no_quality else f"{recall_at_k(chunks, docs, args.queries, args.k, random.Random(1)):.3f}"
+        print(f"{method:<10} {len(chunks):>7} {len(chunks) / elapsed:>10.1f} {size_mb / elapsed:>8.2f} {recall:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Offline end-to-end benchmark of /upload/file ingestion and /agent/query under load.
+
+Every external service is replaced by a local stand-in (see benchmarks/standins.py):
+a scripted fake LLM, the in-memory vector store, fakeredis, SQLite and an SMTP
+sink. Requests go through the real FastAPI app in-process via httpx's ASGI
+transport, with the app's lifespan running.
+
+Results are written as JSON. With --baseline, the run is compared against an
+earlier result file and exits non-zero when p95 latency, RPS or ingestion
+throughput regress by more than --max-regression.
+
+Run from the backend directory:
+    python -m benchmarks.e2e_load --concurrency 1 4 16 64 --requests 200 --output bench.json
+    python -m benchmarks.e2e_load --fake-embeddings --llm-latency 0.05 --baseline bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from uuid import uuid4
+
+# app (and modules importing it) are imported only after configure_environment
+from benchmarks.standins import configure_environment, start_fake_redis, start_smtp_sink
+
+
+def percentile(sorted_values, p: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_ingestion(client, files: int, file_kb: int) -> dict:
+    """Upload `files` distinct text files at once and wait until every job finishes"""
+
+    from benchmarks.embedding_throughput import make_chunks
+
+    payloads = [" ".join(make_chunks(file_kb, size=1000, seed=i)).encode() for i in range(files)]
+
+    start = time.perf_counter()
+    jobs = []
+    for i, data in enumerate(payloads):
+        response = await client.post("/upload/file", files={"file": (f"bench-{i}.txt", data, "text/plain")})
+        response.raise_for_status()
+        jobs.append(response.json()["job_id"])
+
+    results = {}
+    while len(results) < len(jobs):
+        await asyncio.sleep(0.05)
+        for job_id in jobs:
+            if job_id not in results:
+                job = (await client.get(f"/upload/jobs/{job_id}")).json()
+                if job["status"] in ("completed", "failed"):
+                    results[job_id] = job
+    elapsed = time.perf_counter() - start
+
+    chunks = sum(job["chunks_embedded"] for job in results.values())
+    total_bytes = sum(len(data) for data in payloads)
+    return {
+        "files": files,
+        "bytes": total_bytes,
+        "chunks": chunks,
+        "failed": sum(job["status"] == "failed" for job in results.values()),
+        "wall_s": round(elapsed, 3),
+        "chunks_per_sec": round(chunks / elapsed, 1),
+        "mb_per_sec": round(total_bytes / 2 ** 20 / elapsed, 3),
+    }
+
+
+async def run_queries(client, concurrency: int, questions, turns: int = 1) -> dict:
+    """Send every question with `concurrency` requests in flight; each thread gets `turns` questions"""
+
+    pending = iter(questions)
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        thread_id, asked = uuid4().hex, 0
+        for question in pending:
+            if asked == turns:
+                thread_id, asked = uuid4().hex, 0
+            asked += 1
+            start = time.perf_counter()
+            try:
+                response = await client.post("/agent/query", json={"question": question},
+                                             headers={"thread-id": thread_id})
+                ok = response.status_code == 200
+            except Exception:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "turns_per_thread": turns,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions of this run against a baseline result, as readable strings"""
+
+    regressions = []
+    old_ingest, new_ingest = baseline.get("ingestion") or {}, result.get("ingestion") or {}
+    if old_ingest.get("chunks_per_sec") and new_ingest.get("chunks_per_sec", 0) < old_ingest["chunks_per_sec"] * (1 - tolerance):
+        regressions.append(f"ingestion chunks/sec {new_ingest['chunks_per_sec']} < baseline {old_ingest['chunks_per_sec']}")
+
+    old_levels = {level["concurrency"]: level for level in baseline.get("query", [])}
+    for level in result["query"]:
+        old = old_levels.get(level["concurrency"])
+        if old is None:
+            continue
+        if level["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append(f"c={level['concurrency']} p95 {level['p95_ms']} ms > baseline {old['p95_ms']} ms")
+        if level["rps"] < old["rps"] * (1 - tolerance):
+            regressions.append(f"c={level['concurrency']} rps {level['rps']} < baseline {old['rps']}")
+    return regressions
+
+
+async def run(args) -> dict:
+    import httpx
+    from app.main import app, lifespan
+    from benchmarks.embedding_throughput import make_chunks
+    from benchmarks.standins import HashEmbeddings, ScriptedChatModel, install_fakes
+
+    install_fakes(
+        ScriptedChatModel(latency=args.llm_latency, tool_calls_per_turn=args.tool_calls),
+        HashEmbeddings() if args.fake_embeddings else None
+    )
+
+    rng = random.Random(args.seed)
+    vocabulary = " ".join(make_chunks(20, seed=args.seed)).split()
+
+    def question() -> str:
+        return f"What does the document say about {' '.join(rng.sample(vocabulary, 3))}?"
+
+    # A fixed pool makes repeats (and cache hits) likely; otherwise every question is new
+    question_pool = [question() for _ in range(args.query_pool)]
+
+    def questions(n: int) -> list:
+        return [rng.choice(question_pool) if question_pool else question() for _ in range(n)]
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            ingestion = await run_ingestion(client, args.files, args.file_kb) if args.files else None
+
+            await run_queries(client, 1, questions(args.warmup))
+            levels = []
+            for concurrency in args.concurrency:
+                levels.append(await run_queries(client, concurrency, questions(args.requests), args.turns))
+                print(json.dumps(levels[-1]), file=sys.stderr)
+
+    return {"ingestion": ingestion, "query": levels}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=200, help="queries per concurrency level")
+    parser.add_argument("--query-pool", type=int, default=0, help="distinct questions (0: every question is new)")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=1, help="questions per conversation thread (long threads exercise summarization)")
+    parser.add_argument("--files", type=int, default=4, help="files uploaded before the query load (0 skips)")
+    parser.add_argument("--file-kb", type=int, default=256)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per fake LLM call")
+    parser.add_argument("--tool-calls", type=int, default=1, help="DocumentSearch calls per question")
+    parser.add_argument("--fake-embeddings", action="store_true", help="hashing embeddings instead of the model")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON result here as well as to stdout")
+    parser.add_argument("--baseline", help="earlier JSON result to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    smtp, _, smtp_port = start_smtp_sink()
+    configure_environment(tmp, start_fake_redis(), smtp_port)
+
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        smtp.stop()
+
+    result["config"] = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    result["environment"] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compare embedding runtimes (torch, onnx, int8) and check their vectors against torch.
+
+Each runtime is loaded in a fresh process so load time and RSS are not shared.
+Every alternative runtime must reach --tolerance cosine similarity with the torch
+vector for every text, otherwise the script exits non-zero.
+
+Run from the backend directory:
+    python -m benchmarks.embedding_runtime --runtimes torch onnx int8 --chunks 256
+"""
+import argparse
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+from benchmarks.embedding_throughput import make_chunks
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2 ** 20
+
+
+def run_runtime(runtime: str, chunks: int, queries: int) -> dict:
+    """Load one runtime and measure it; runs in its own process"""
+
+    from app.embedding.runtime import load_embeddings
+
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    model = load_embeddings(runtime)
+    load_s = time.perf_counter() - start
+
+    texts = make_chunks(chunks)
+    model.embed_documents(texts[:8])        # warm up
+
+    start = time.perf_counter()
+    vectors = np.asarray(model.embed_documents(texts), dtype=np.float32)
+    batch_s = time.perf_counter() - start
+
+    latencies = []
+    for i in range(queries):
+        start = time.perf_counter()
+        model.embed_query(f"what does the document say about item {i}?")
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    return {
+        "runtime": runtime,
+        "load_s": load_s,
+        "chunks_per_sec": chunks / batch_s,
+        "query_p50_ms": statistics.median(latencies),
+        "query_p95_ms": latencies[int(len(latencies) * 0.95)],
+        "rss_model_mb": _rss_mb() - rss_before,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "vectors": vectors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runtimes", nargs="+", default=["torch", "onnx", "int8"])
+    parser.add_argument("--chunks", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--tolerance", type=float, default=0.99, help="minimum cosine similarity to torch")
+    args = parser.parse_args()
+
+    runtimes = ["torch"] + [r for r in args.runtimes if r != "torch"]
+    results = []
+    for runtime in runtimes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            results.append(pool.submit(run_runtime, runtime, args.chunks, args.queries).result())
+
+    reference = results[0]["vectors"]
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+
+    print(f"{'runtime':<8} {'load s':>7} {'chunks/s':>9} {'q p50 ms':>9} {'q p95 ms':>9} "
+          f"{'model MB':>9} {'peak MB':>8} {'min cos':>8} {'mean cos':>9}")
+    failed = False
+    for r in results:
+        vectors = r["vectors"] / np.linalg.norm(r["vectors"], axis=1, keepdims=True)
+        cosine = np.einsum("ij,ij->i", vectors, reference)
+        failed |= bool(cosine.min() < args.tolerance)
+        print(f"{r['runtime']:<8} {r['load_s']:7.2f} {r['chunks_per_sec']:9.1f} {r['query_p50_ms']:9.2f} "
+              f"{r['query_p95_ms']:9.2f} {r['rss_model_mb']:9.0f} {r['peak_rss_mb']:8.0f} "
+              f"{cosine.min():8.4f} {cosine.mean():9.4f}")
+
+    if failed:
+        print(f"FAILED: a runtime fell below cosine {args.tolerance} against torch")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Compare chunks/sec of the per-chunk embed_query loop against batched embed_texts.
+
+Run from the backend directory:
+    python -m benchmarks.embedding_throughput --chunks 512
+"""
+import argparse
+import random
+import string
+import time
+
+from app.embedding.embedder import get_embeddings, embed_texts
+
+
+def make_chunks(n: int, size: int = 1000, seed: int = 0):
+    """Generate n pseudo-text chunks of roughly `size` characters"""
+
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10))) for _ in range(2000)]
+    chunks = []
+    for _ in range(n):
+        text = []
+        length = 0
+        while length < size:
+            word = rng.choice(words)
+            text.append(word)
+            length += len(word) + 1
+        chunks.append(" ".join(text))
+    return chunks
+
+
+def bench(label, fn, n):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.2f}s  {n / elapsed:10.1f} chunks/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=512)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 128])
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    hf = get_embeddings()
+    hf.embed_query("warm up")
+
+    bench("embed_query loop", lambda: [hf.embed_query(c) for c in chunks], len(chunks))
+    for batch_size in args.batch_sizes:
+        bench(f"embed_texts batch={batch_size}",
+              lambda: embed_texts(chunks, batch_size=batch_size, workers=0), len(chunks))
+    if args.workers > 1:
+        bench(f"embed_texts workers={args.workers}",
+              lambda: embed_texts(chunks, workers=args.workers), len(chunks))
+
+
+if __name__ == "__main__":
+    main()
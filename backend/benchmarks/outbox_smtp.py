@@ -0,0 +1,66 @@
+"""Drain the email outbox into a local aiosmtpd sink.
+
+Queues --emails confirmations in a SQLite outbox, drains them with
+OutboxWorker over one SMTP connection and checks every message arrived.
+With --fail-first, the sink rejects each recipient once to exercise the
+retry/backoff path.
+
+Run from the backend directory (needs `pip install aiosmtpd`):
+    python -m benchmarks.outbox_smtp --emails 200
+"""
+import argparse
+import os
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("DB_URL", f"sqlite:///{_tmp}/files.db")
+os.environ.setdefault("BOOKING_INFO_DB_URL", f"sqlite:///{_tmp}/booking.db")
+
+from sqlalchemy import func, select
+
+from app.db.session import Base, engine_booking, SessionLocal_booking
+from app.db.models.booking_db import EmailOutbox
+from app.utils.outbox import OutboxWorker, queue_confirmation_email
+from app.utils.send_mail import SMTPMailer
+from benchmarks.standins import start_smtp_sink
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--fail-first", action="store_true")
+    args = parser.parse_args()
+
+    controller, handler, port = start_smtp_sink(args.fail_first)
+
+    Base.metadata.create_all(bind=engine_booking)
+    with SessionLocal_booking() as db:
+        for i in range(args.emails):
+            queue_confirmation_email(db, f"User {i}", f"user{i}@example.com", "2030-01-01", "9am")
+        db.commit()
+
+    mailer = SMTPMailer(host="127.0.0.1", port=port,
+                        login=None, password=None, starttls=False, sender="bench@example.com")
+    worker = OutboxWorker(SessionLocal_booking, mailer=mailer, batch_size=args.batch_size, backoff_base=0)
+
+    start = time.perf_counter()
+    deadline = start + 60
+    while len(handler.received) < args.emails and time.perf_counter() < deadline:
+        worker.drain_once()
+    elapsed = time.perf_counter() - start
+    mailer.close()
+    controller.stop()
+
+    with SessionLocal_booking() as db:
+        pending = db.scalar(select(func.count()).select_from(EmailOutbox).where(EmailOutbox.status != "sent"))
+
+    print(f"{len(handler.received)}/{args.emails} delivered in {elapsed:.2f}s "
+          f"({len(handler.received) / elapsed:.1f} emails/sec), {pending} not marked sent")
+    if len(set(handler.received)) != args.emails or pending:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Measure the latency the cross-encoder rerank stage adds per search, cold and cached.
+
+Run from the backend directory:
+    python -m benchmarks.rerank_latency --candidates 20 --budget-ms 150
+"""
+import argparse
+import statistics
+
+from app.embedding.reranker import CrossEncoderReranker
+from benchmarks.embedding_throughput import make_chunks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--budget-ms", type=float, default=150)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    reranker = CrossEncoderReranker(batch_size=args.batch_size, budget_ms=args.budget_ms)
+    texts = make_chunks(args.candidates, size=1000)
+    reranker.rerank("warm up", texts[:1], 1)       # load the model outside the measurement
+
+    for label, suffix in (("cold", lambda i: f" {i}"), ("cached", lambda i: " 0")):
+        added, fallbacks = [], 0
+        for i in range(args.queries):
+            _, report = reranker.rerank(f"what does the document say about topic{suffix(i)}", texts, 3)
+            added.append(report["added_ms"])
+            fallbacks += report["fallback"] is not None
+        added.sort()
+        print(f"{label:<7} p50 {statistics.median(added):8.2f} ms  p95 {added[int(len(added) * 0.95)]:8.2f} ms  "
+              f"fallbacks {fallbacks}/{args.queries}")
+
+
+if __name__ == "__main__":
+    main()
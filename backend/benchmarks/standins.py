@@ -0,0 +1,179 @@
+"""Local stand-ins for the external services, so benchmarks run offline and reproducibly.
+
+    configure_environment  point the app at temp SQLite DBs, the in-memory vector store,
+                           the in-memory checkpointer, a fake Redis and a local SMTP sink
+    start_fake_redis       fakeredis served over TCP, so the app's own Redis clients are used
+    start_smtp_sink        aiosmtpd controller that accepts (or first rejects) every message
+    ScriptedChatModel      chat model that answers after a scripted number of DocumentSearch
+                           calls, with configurable latency and reported token usage
+    HashEmbeddings         deterministic hashed bag-of-words vectors, instead of the real model
+
+Nothing here imports `app`: configure_environment must run before the first app import.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import socket
+import threading
+import time
+from typing import Any, List, Optional
+from uuid import uuid4
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def configure_environment(tmp_dir: str, redis_url: str, smtp_port: int):
+    """Settings are read at import time, so this has to run before importing app"""
+
+    os.environ.update({
+        "DB_URL": f"sqlite:///{tmp_dir}/files.db",
+        "BOOKING_INFO_DB_URL": f"sqlite:///{tmp_dir}/booking.db",
+        "VECTOR_STORE_BACKEND": "memory",
+        "BM25_INDEX_PATH": os.path.join(tmp_dir, "bm25_index.npz"),
+        "CHECKPOINTER_BACKEND": "memory",       # fakeredis has no RediSearch, which AsyncRedisSaver needs
+        "REDIS_CACHE_URL": redis_url,
+        "REDIS_MEMORY_URL": redis_url,
+        "SEMANTIC_CACHE_ENABLED": "false",
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_LOGIN": "",
+        "SMTP_STARTTLS": "false",
+        "STARTUP_WARMUP": "off",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+    })
+
+
+def start_fake_redis() -> str:
+    """Serve fakeredis on a local port and return its URL"""
+
+    from fakeredis import TcpFakeServer
+
+    port = free_port()
+    server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+    threading.Thread(target=server.serve_forever, name="fake-redis", daemon=True).start()
+    return f"redis://127.0.0.1:{port}/0"
+
+
+class SinkHandler:
+    """aiosmtpd handler that records recipients; with fail_first each recipient is rejected once"""
+
+    def __init__(self, fail_first: bool = False):
+        self.received = []
+        self.rejected = set()
+        self.fail_first = fail_first
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if self.fail_first and address not in self.rejected:
+            self.rejected.add(address)
+            return "451 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received.extend(envelope.rcpt_tos)
+        return "250 Message accepted for delivery"
+
+
+def start_smtp_sink(fail_first: bool = False):
+    """Start an SMTP sink on a free port; returns (controller, handler, port)"""
+
+    from aiosmtpd.controller import Controller
+
+    handler = SinkHandler(fail_first)
+    port = free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    return controller, handler, port
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Fake LLM: calls DocumentSearch `tool_calls_per_turn` times per question, then answers.
+
+    Every call waits `latency` seconds, standing in for the provider round trip,
+    and reports approximate token usage so the LLM metrics are exercised.
+    """
+
+    latency: float = 0.2
+    tool_calls_per_turn: int = 1
+    answer_words: int = 60
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        question, searches = "", 0
+        for msg in reversed(messages):
+            if isinstance(msg, HumanMessage):
+                question = str(msg.content)
+                break
+            searches += isinstance(msg, ToolMessage)
+
+        if searches < self.tool_calls_per_turn:
+            query = question if searches == 0 else f"{question} (more detail {searches})"
+            reply = AIMessage(content="", tool_calls=[{
+                "name": "DocumentSearch", "args": {"query": query}, "id": f"call_{uuid4().hex[:12]}", "type": "tool_call"
+            }])
+            output_tokens = 20
+        else:
+            reply = AIMessage(content=" ".join(["answer"] * self.answer_words))
+            output_tokens = self.answer_words
+
+        input_tokens = sum(len(str(m.content)) // 4 + 1 for m in messages)
+        reply.usage_metadata = {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                                "total_tokens": input_tokens + output_tokens}
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return self._respond(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._respond(messages)
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic signed feature hashing of words; no model download, no torch"""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            digest = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+            vector[digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def install_fakes(llm: BaseChatModel, embeddings: Optional[Embeddings] = None):
+    """Swap the app's lazily built LLMs (and optionally the embedding model) for the stand-ins"""
+
+    from app.agent import rag_graph
+    from app.embedding import embedder
+
+    rag_graph.get_llm = lambda: llm
+    summary_llm = llm.model_copy(update={"tool_calls_per_turn": 0})
+    rag_graph.get_summary_llm = lambda: summary_llm
+    if embeddings is not None:
+        embedder.get_embeddings = lambda: embeddings
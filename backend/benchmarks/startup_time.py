@@ -0,0 +1,61 @@
+"""Measure worker cold start: importing app.main, running its lifespan startup, and the optional warm-up.
+
+Each run is a fresh interpreter, so nothing is shared between runs. SQLite
+databases in a temp directory stand in for the configured ones.
+
+Run from the backend directory:
+    python -m benchmarks.startup_time --runs 5
+    python -m benchmarks.startup_time --runs 3 --warmup blocking
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+CHILD = """
+import asyncio, json, time
+start = time.perf_counter()
+import app.main as main
+imported = time.perf_counter()
+
+async def startup():
+    async with main.lifespan(main.app):
+        ready = time.perf_counter()
+        loaded = (await main.health())["loaded"]
+    return ready, loaded
+
+ready, loaded = asyncio.run(startup())
+print(json.dumps({"import_s": imported - start, "ready_s": ready - start, "loaded": loaded}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", default="off", choices=["off", "background", "blocking"])
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "STARTUP_WARMUP": args.warmup,
+            "DB_URL": os.environ.get("DB_URL", f"sqlite:///{tmp}/files.db"),
+            "BOOKING_INFO_DB_URL": os.environ.get("BOOKING_INFO_DB_URL", f"sqlite:///{tmp}/booking.db"),
+        }
+        for _ in range(args.runs):
+            out = subprocess.run([sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True)
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    for key in ("import_s", "ready_s"):
+        values = [r[key] for r in results]
+        print(f"{key:<9} median {statistics.median(values):6.2f}s  min {min(values):6.2f}s  max {max(values):6.2f}s")
+    print(f"warmup={args.warmup} loaded at ready: {results[-1]['loaded']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Measure query latency of the local vector store backends on random vectors.
+
+Run from the backend directory:
+    python -m benchmarks.vector_search_latency --rows 200000 --index flat
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from app.vectorstore.local import LocalVectorStore
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--index", default="flat", choices=["flat", "ivf", "hnsw"])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as path:
+        store = LocalVectorStore(path=path, index_type=args.index, dim=args.dim)
+        for start in range(0, args.rows, 10_000):
+            n = min(10_000, args.rows - start)
+            values = rng.standard_normal((n, args.dim), dtype=np.float32)
+            store.upsert([{"id": str(start + i), "values": values[i], "metadata": {"text": f"chunk {start + i}"}}
+                          for i in range(n)])
+
+        queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+        store.query(queries[0], top_k=3)        # builds the ANN index if any
+
+        latencies = []
+        for q in queries:
+            start = time.perf_counter()
+            store.query(q, top_k=3)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    print(f"index={args.index} rows={args.rows}")
+    print(f"p50 {statistics.median(latencies):.3f} ms  p95 {latencies[int(len(latencies) * 0.95)]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()